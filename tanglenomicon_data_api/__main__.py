@@ -4,8 +4,12 @@ from .montesinos import generation_endpoint as mont_ge
 from .montesinos import presentation_endpoint as mont_pe
 from .generic import presentation_endpoint as gen_pe
 from .rational import presentation_endpoint as rat_pe
+from .rational import page_index as rat_pi
 from .montesinos import job as mont_j
+from .montesinos import stencils as mont_s
 from .internal import config_store, db_connector, security, job_queue
+from .internal import cursor as keyset
+from .internal import rank_index
 from fastapi import FastAPI
 from uvicorn import Config as UCfg, Server as USrv
 import typer
@@ -19,7 +23,11 @@ loop: AbstractEventLoop = asyncio.new_event_loop()
 api: FastAPI = FastAPI()
 routers = [security, mont_ge, mont_pe, rat_pe, gen_pe]
 job_defs = [
+    rat_pi.startup_task,
     mont_j.startup_task,
+    mont_j.task_fill_job_queue,
+    mont_s.task_generate_stencils,
+    rank_index.task_rank_tangles,
     job_queue.task_clean_complete_jobs,
     job_queue.task_clean_stale_jobs,
 ]
@@ -34,6 +42,7 @@ api.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", keyset.CURSOR_HEADER],
 )
 
 
@@ -49,6 +58,7 @@ def _startup():
         db_cfg["password"],
         db_cfg["database"],
     )
+    job_queue.init_backend()
 
 
 def _main():
@@ -82,6 +92,32 @@ def adduser(
     ...
 
 
+@app.command()
+def genstencils(
+    cfg: Annotated[str, typer.Option(prompt="Path to configuration file.")],
+    crossing_num_min: Annotated[int, typer.Option(prompt="Lowest crossing number")],
+    crossing_num_max: Annotated[int, typer.Option(prompt="Highest crossing number")],
+):
+    """Generate the Montesinos stencils of a range of crossing numbers."""
+    config_store.load(cfg)
+    _startup()
+    inserted = loop.run_until_complete(
+        mont_s.generate_stencils(crossing_num_min, crossing_num_max)
+    )
+    print(f"Inserted {inserted} stencils.")
+
+
+@app.command()
+def resetstencils(
+    cfg: Annotated[str, typer.Option(prompt="Path to configuration file.")],
+):
+    """Reset the started Montesinos stencils to the new state."""
+    config_store.load(cfg)
+    _startup()
+    reset = loop.run_until_complete(mont_s.reset_started_stencils())
+    print(f"Reset {reset} stencils.")
+
+
 @app.command()
 def run(
     cfg: Annotated[str, typer.Option(prompt="Path to configuration file.")],
@@ -1,10 +1,11 @@
 """Defines the public API endpoints to work/report on generic tangles."""
 
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Response
 from . import orm
 from ..internal import job_queue
+from ..internal import cursor as keyset
+from ..internal import fast_json
 from typing import Annotated, List
-from dacite import from_dict
 
 router = APIRouter(
     tags=["Generic"],
@@ -19,17 +20,31 @@ router = APIRouter(
 
 
 async def _retrieve_generic_tangles(
+    response: Response,
     start_id: str = None,
     crossing_num_min: int = 0,
     page_idx: int = 0,
     page_size: int = 100,
+    cursor: str = None,
 ):
     if page_size <= 0:
         raise HTTPException(status_code=404, detail="Page size must be positive")
     tangle_col = orm.get_generic_collection()
-    if start_id is None:
+    fields = fast_json.projection(orm.GenericTangDB)
+    if cursor is not None:
+        try:
+            after = keyset.decode_cursor("generic", cursor)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Invalid cursor")
         tangle_page = (
-            await tangle_col.find({"crossing_num": {"$gte": crossing_num_min}})
+            await tangle_col.find(keyset.keyset_filter(*after), fields)
+            .sort([("crossing_num", 1), ("_id", 1)])
+            .limit(page_size)
+            .to_list(page_size)
+        )
+    elif start_id is None:
+        tangle_page = (
+            await tangle_col.find({"crossing_num": {"$gte": crossing_num_min}}, fields)
             .sort([("crossing_num", 1), ("_id", 1)])
             .limit(page_size)
             .to_list(page_size)
@@ -45,7 +60,8 @@ async def _retrieve_generic_tangles(
                                 "_id": {"$gt": tangle_page[-1]["_id"]},
                             },
                         ]
-                    }
+                    },
+                    fields,
                 )
                 .sort([("crossing_num", 1), ("_id", 1)])
                 .limit(page_size)
@@ -62,13 +78,15 @@ async def _retrieve_generic_tangles(
                             "_id": {"$gt": start_id},
                         },
                     ]
-                }
+                },
+                fields,
             )
             .sort([("crossing_num", 1), ("_id", 1)])
             .limit(page_size)
             .to_list(page_size)
         )
-    return [from_dict(data_class=orm.GenericTangDB, data=tang) for tang in tangle_page]
+    keyset.set_next_cursor(response, "generic", tangle_page, page_size)
+    return tangle_page
 
 
 async def _retrieve_generic_tangle(id: str):
@@ -81,7 +99,8 @@ async def _retrieve_generic_tangle(id: str):
 
 @router.get("/tangles", response_model=List[orm.GenericTangDB])
 async def retrieve_generic_tangles(
-    tangle_list: Annotated[List[orm.GenericTangDB], Depends(_retrieve_generic_tangles)]
+    tangle_list: Annotated[List[dict], Depends(_retrieve_generic_tangles)],
+    response: Response,
 ):
     """Return the next generic job.
 
@@ -95,7 +114,7 @@ async def retrieve_generic_tangles(
     generic_Job
         The next generic Job.
     """
-    return tangle_list
+    return fast_json.tangle_response(tangle_list, orm.GenericTangDB, response)
 
 
 @router.get("/tangle")
@@ -3,6 +3,7 @@
 from datetime import datetime
 from pydantic import BaseModel
 from enum import Enum
+from typing import List, Dict
 
 
 class JobStateEnum(str, Enum):
@@ -52,6 +53,73 @@ class GenerationJob(BaseModel):
         """
         raise NotImplementedError
 
+    @classmethod
+    async def store_many(cls, jobs: List["GenerationJob"]) -> List[bool]:
+        """Store the results of a batch of jobs of this type.
+
+        Implementations may override this to coalesce the writes of many jobs,
+        by default each job is stored on its own.
+
+        Parameters
+        ----------
+        jobs : List[GenerationJob]
+            The jobs to store.
+
+        Returns
+        -------
+        List[bool]
+            Indicator for success of storage for each job.
+        """
+        return [await job.store() for job in jobs]
+
+    def to_document(self) -> dict:
+        """Return the job, including its private state, as a document.
+
+        Returns
+        -------
+        dict
+            A JSON compatible document with the fields and private attributes.
+        """
+        private = dict()
+        for name, value in (self.__pydantic_private__ or dict()).items():
+            if isinstance(value, BaseModel):
+                value = value.model_dump(mode="json")
+            private[name] = value
+        return {
+            "fields": self.model_dump(mode="json", exclude_none=True),
+            "private": private,
+        }
+
+    @classmethod
+    def from_document(cls, doc: dict) -> "GenerationJob":
+        """Build a job from a document created by ``to_document``.
+
+        Parameters
+        ----------
+        doc : dict
+            The document to load.
+
+        Returns
+        -------
+        GenerationJob
+            The loaded job.
+        """
+        annotations: Dict[str, type] = dict()
+        for klass in reversed(cls.__mro__):
+            if isinstance(klass, type) and issubclass(klass, GenerationJob):
+                annotations.update(klass.__dict__.get("__annotations__", dict()))
+        job = cls.model_validate(doc["fields"])
+        for name, value in doc["private"].items():
+            hint = annotations.get(name)
+            if (
+                isinstance(value, dict)
+                and isinstance(hint, type)
+                and issubclass(hint, BaseModel)
+            ):
+                value = hint.model_validate(value)
+            setattr(job, name, value)
+        return job
+
     def update_results(self, res: GenerationJobResults):
         """Interface for functions to update job with results.
 
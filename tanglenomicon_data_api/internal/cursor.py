@@ -0,0 +1,116 @@
+"""Signed keyset cursors for paging tangle collections.
+
+Tangles are paged in ``(crossing_num, _id)`` order. A cursor holds the key of the
+last tangle of a page, signed with the auth secret so clients can not forge it,
+and the next page is a single range query after that key.
+"""
+
+from . import config_store
+from fastapi import Response
+from jose import JWTError, jwt
+from typing import List, Tuple
+
+CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(scope: str, crossing_num: int, tangle_id: str) -> str:
+    """Return a signed cursor after a tangle.
+
+    Parameters
+    ----------
+    scope : str
+        The collection the cursor pages, a cursor only decodes in its scope.
+    crossing_num : int
+        The crossing number of the last tangle.
+    tangle_id : str
+        The id of the last tangle.
+
+    Returns
+    -------
+    str
+        The opaque cursor.
+    """
+    auth_cfg = config_store.cfg_dict["auth"]
+    return jwt.encode(
+        {"scope": scope, "cn": crossing_num, "id": tangle_id},
+        auth_cfg["secret_key"],
+        algorithm=auth_cfg["algorithm"],
+    )
+
+
+def decode_cursor(scope: str, cursor: str) -> Tuple[int, str]:
+    """Return the key a cursor points after.
+
+    Parameters
+    ----------
+    scope : str
+        The collection being paged.
+    cursor : str
+        The cursor from a previous page.
+
+    Returns
+    -------
+    Tuple[int, str]
+        The crossing number and id of the last tangle of the previous page.
+
+    Raises
+    ------
+    ValueError
+        The cursor is not signed by this server or is for another scope.
+    """
+    auth_cfg = config_store.cfg_dict["auth"]
+    try:
+        payload = jwt.decode(
+            cursor, auth_cfg["secret_key"], algorithms=[auth_cfg["algorithm"]]
+        )
+    except JWTError as e:
+        raise ValueError("Invalid cursor.") from e
+    if payload.get("scope") != scope:
+        raise ValueError("Invalid cursor.")
+    return payload["cn"], payload["id"]
+
+
+def keyset_filter(crossing_num: int, tangle_id: str) -> dict:
+    """Return the filter for the tangles after a key.
+
+    Parameters
+    ----------
+    crossing_num : int
+        The crossing number of the key.
+    tangle_id : str
+        The id of the key.
+
+    Returns
+    -------
+    dict
+        The filter matching tangles after the key in ``(crossing_num, _id)`` order.
+    """
+    return {
+        "$or": [
+            {"crossing_num": {"$gt": crossing_num}},
+            {"crossing_num": crossing_num, "_id": {"$gt": tangle_id}},
+        ]
+    }
+
+
+def set_next_cursor(
+    response: Response, scope: str, tangle_page: List[dict], page_size: int
+):
+    """Add the cursor of the next page to a response if the page is full.
+
+    Parameters
+    ----------
+    response : Response
+        The response to add the ``X-Next-Cursor`` header to.
+    scope : str
+        The collection being paged.
+    tangle_page : List[dict]
+        The tangle documents of the page.
+    page_size : int
+        The requested page size.
+    """
+    if tangle_page and len(tangle_page) >= page_size:
+        last = tangle_page[-1]
+        response.headers[CURSOR_HEADER] = encode_cursor(
+            scope, last["crossing_num"], last["_id"]
+        )
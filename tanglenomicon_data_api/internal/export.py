@@ -0,0 +1,267 @@
+"""Streaming export of whole tangle classes.
+
+A tangle class is exported with one database cursor in ``(crossing_num, _id)``
+order. Rows are written as NDJSON or CSV, or as typed columns in Arrow IPC stream or
+Parquet batches, and streamed in chunks, so the memory used does not grow with the
+size of the export. An interrupted export is resumed by passing the last ``_id`` it
+emitted. The columnar formats need the optional ``pyarrow`` package, it is imported
+when such an export is requested.
+"""
+
+from . import cursor as keyset
+from enum import Enum
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, get_args, get_origin, get_type_hints
+import csv
+import dataclasses
+import io
+import json
+
+_BATCH_SIZE = 10000
+_CHUNK_ROWS = 1000
+
+
+class ExportFormatEnum(str, Enum):
+    """Enum describing the formats of an export."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+    arrow = "arrow"
+    parquet = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormatEnum.ndjson: "application/x-ndjson",
+    ExportFormatEnum.csv: "text/csv",
+    ExportFormatEnum.arrow: "application/vnd.apache.arrow.stream",
+    ExportFormatEnum.parquet: "application/vnd.apache.parquet",
+}
+COLUMNAR_FORMATS = (ExportFormatEnum.arrow, ExportFormatEnum.parquet)
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write only stream handing out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        """Return the bytes written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _load_pyarrow():
+    """Import pyarrow for a columnar export.
+
+    Returns
+    -------
+    module
+        The pyarrow module.
+
+    Raises
+    ------
+    HTTPException
+        pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise HTTPException(
+            status_code=501, detail="Columnar exports need pyarrow installed"
+        )
+    return pyarrow
+
+
+def _arrow_schema(pa, tangle_class):
+    """Return the Arrow schema of a tangle ORM class.
+
+    Parameters
+    ----------
+    pa : module
+        The pyarrow module.
+    tangle_class : type
+        The dataclass of the tangles.
+
+    Returns
+    -------
+    pyarrow.Schema
+        A column per field, ``List[int]`` fields are ``list<int64>`` columns.
+    """
+    scalars = {int: pa.int64(), str: pa.string(), bool: pa.bool_()}
+    hints = get_type_hints(tangle_class)
+    columns = []
+    for field in dataclasses.fields(tangle_class):
+        hint = hints[field.name]
+        if get_origin(hint) in (list, List):
+            columns.append((field.name, pa.list_(scalars[get_args(hint)[0]])))
+        else:
+            columns.append((field.name, scalars.get(hint, pa.string())))
+    return pa.schema(columns)
+
+
+async def _batches(
+    pa, tangles: AsyncIterator[dict], tangle_class, fmt: ExportFormatEnum
+) -> AsyncIterator[bytes]:
+    """Encode tangle documents as Arrow IPC stream or Parquet batches.
+
+    Parameters
+    ----------
+    pa : module
+        The pyarrow module.
+    tangles : AsyncIterator[dict]
+        The tangle documents.
+    tangle_class : type
+        The dataclass of the tangles.
+    fmt : ExportFormatEnum
+        Arrow or Parquet.
+
+    Yields
+    ------
+    AsyncIterator[bytes]
+        The encoded bytes of every batch of at most ``_BATCH_SIZE`` tangles.
+    """
+    schema = _arrow_schema(pa, tangle_class)
+    sink = _ChunkSink()
+    if fmt == ExportFormatEnum.arrow:
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        writer = pa.parquet.ParquetWriter(sink, schema)
+    columns = {name: [] for name in schema.names}
+    rows = 0
+    async for tang in tangles:
+        for name, column in columns.items():
+            column.append(tang.get(name))
+        rows += 1
+        if rows == _BATCH_SIZE:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+            columns = {name: [] for name in schema.names}
+            rows = 0
+    if rows:
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def _csv_value(value):
+    """Return a value as a CSV cell, lists are written as JSON."""
+    return json.dumps(value) if isinstance(value, (list, dict)) else value
+
+
+async def _rows(
+    tangles: AsyncIterator[dict], fields: List[str], fmt: ExportFormatEnum
+) -> AsyncIterator[str]:
+    """Encode tangle documents as chunks of rows.
+
+    Parameters
+    ----------
+    tangles : AsyncIterator[dict]
+        The tangle documents.
+    fields : List[str]
+        The fields of a row.
+    fmt : ExportFormatEnum
+        The format of the rows.
+
+    Yields
+    ------
+    AsyncIterator[str]
+        Chunks of at most ``_CHUNK_ROWS`` rows.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == ExportFormatEnum.csv:
+        writer.writerow(fields)
+    rows = 0
+    async for tang in tangles:
+        if fmt == ExportFormatEnum.csv:
+            writer.writerow([_csv_value(tang.get(f)) for f in fields])
+        else:
+            buffer.write(json.dumps({f: tang.get(f) for f in fields}) + "\n")
+        rows += 1
+        if rows == _CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def export_tangles(
+    tangle_col,
+    class_filter: dict,
+    tangle_class,
+    fmt: ExportFormatEnum,
+    crossing_num_min: int = 0,
+    crossing_num_max: int = None,
+    start_id: str = None,
+) -> StreamingResponse:
+    """Return a streaming export of the tangles of a class.
+
+    Parameters
+    ----------
+    tangle_col : AsyncIOMotorCollection
+        The collection of the class.
+    class_filter : dict
+        The filter selecting the tangles of the class.
+    tangle_class : type
+        The dataclass of the tangles, its fields are exported.
+    fmt : ExportFormatEnum
+        The format of the export.
+    crossing_num_min : int, optional
+        The lowest crossing number to export, by default 0.
+    crossing_num_max : int, optional
+        The highest crossing number to export, by default no bound.
+    start_id : str, optional
+        The last ``_id`` of an interrupted export, the export resumes after it.
+
+    Returns
+    -------
+    StreamingResponse
+        The rows of the export.
+
+    Raises
+    ------
+    HTTPException
+        The ``start_id`` is not a tangle of the class, or a columnar export is
+        requested without pyarrow installed.
+    """
+    fields = [field.name for field in dataclasses.fields(tangle_class)]
+    pa = _load_pyarrow() if fmt in COLUMNAR_FORMATS else None
+    crossing_nums = {"$gte": crossing_num_min}
+    if crossing_num_max is not None:
+        crossing_nums["$lte"] = crossing_num_max
+    export_filter = class_filter | {"crossing_num": crossing_nums}
+    if start_id is not None:
+        last = await tangle_col.find_one(
+            class_filter | {"_id": start_id}, {"crossing_num": 1}
+        )
+        if last is None:
+            raise HTTPException(status_code=404, detail="Start id not found")
+        export_filter |= keyset.keyset_filter(last["crossing_num"], start_id)
+    tangles = (
+        tangle_col.find(export_filter, {f: 1 for f in fields})
+        .sort([("crossing_num", 1), ("_id", 1)])
+        .batch_size(_BATCH_SIZE)
+    )
+    if pa is not None:
+        content = _batches(pa, tangles, tangle_class, fmt)
+    else:
+        content = _rows(tangles, fields, fmt)
+    return StreamingResponse(content, media_type=MEDIA_TYPES[fmt])
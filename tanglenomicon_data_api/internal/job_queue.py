@@ -3,29 +3,272 @@
 from ..interfaces.job import GenerationJob, GenerationJobResults, JobStateEnum
 from ..internal.security import User
 from . import config_store
+from . import db_connector as dbc
+from .mongo_job_queue import MongoJobQueue
 
 
-from typing import Dict, Type, List
-from datetime import datetime, timezone
+from typing import Dict, Type, List, Iterator, Tuple
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta, timezone
 import asyncio
+import heapq
+import itertools
 import logging
 
 logger = logging.getLogger("uvicorn")
 
 
-_job_queue: Dict[str, GenerationJob] = dict()
+class JobQueue(MutableMapping):
+    """A mapping of job ids to jobs indexed by job type and job state.
+
+    Every job is kept in an ordered bucket for its concrete type and current
+    state. Leasing, completing, requeueing and deleting a job only touch the
+    buckets of that job and never walk the whole queue. Per client state
+    counters are kept alongside the buckets and updated on every transition.
+    Pending jobs are also kept in a min-heap ordered by lease start so expired
+    leases are found without a scan.
+    """
+
+    def __init__(self):
+        """Initialize an empty job queue."""
+        self._jobs: Dict[str, GenerationJob] = dict()
+        self._buckets: Dict[
+            Type[GenerationJob], Dict[JobStateEnum, OrderedDict[str, None]]
+        ] = dict()
+        self._client_counts: Dict[Type[GenerationJob], Dict[str, Counter]] = dict()
+        self._leases: List[Tuple[datetime, int, str]] = list()
+        self._lease_seq = itertools.count()
+
+    def __getitem__(self, job_id: str) -> GenerationJob:
+        """Return the job for an id."""
+        return self._jobs[job_id]
+
+    def __setitem__(self, job_id: str, job: GenerationJob):
+        """Add or replace a job, indexing it under its current state."""
+        if job_id in self._jobs:
+            self._unindex(job_id)
+        self._jobs[job_id] = job
+        self._index(job_id)
+
+    def __delitem__(self, job_id: str):
+        """Remove a job and its index entry."""
+        self._unindex(job_id)
+        del self._jobs[job_id]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate the job ids in insertion order."""
+        return iter(self._jobs)
+
+    def __len__(self) -> int:
+        """Return the number of jobs in the queue."""
+        return len(self._jobs)
+
+    def _bucket(
+        self, job_type: Type[GenerationJob], state: JobStateEnum
+    ) -> OrderedDict[str, None]:
+        """Return the bucket of ids for a concrete type and state."""
+        if job_type not in self._buckets:
+            self._buckets[job_type] = {s: OrderedDict() for s in JobStateEnum}
+        return self._buckets[job_type][state]
+
+    def _index(self, job_id: str):
+        """Add a job id to the bucket and counters for its current state."""
+        job = self._jobs[job_id]
+        self._bucket(type(job), job.cur_state)[job_id] = None
+        clients = self._client_counts.setdefault(type(job), dict())
+        clients.setdefault(job.client_id, Counter())[job.cur_state] += 1
+        if job.cur_state == JobStateEnum.pending:
+            heapq.heappush(
+                self._leases, (job.timestamp, next(self._lease_seq), job_id)
+            )
+
+    def _unindex(self, job_id: str):
+        """Remove a job id from the bucket and counters for its current state."""
+        job = self._jobs[job_id]
+        self._bucket(type(job), job.cur_state).pop(job_id, None)
+        clients = self._client_counts[type(job)]
+        clients[job.client_id][job.cur_state] -= 1
+        if clients[job.client_id].total() == 0:
+            del clients[job.client_id]
+
+    def _types(self, job_type: Type[GenerationJob]) -> List[Type[GenerationJob]]:
+        """Return the indexed concrete types that are a ``job_type``."""
+        return [t for t in self._buckets if issubclass(t, job_type)]
+
+    def ids(self, job_type: Type[GenerationJob], state: JobStateEnum) -> List[str]:
+        """Return the ids of all jobs of a type in a state.
+
+        Parameters
+        ----------
+        job_type : Type[GenerationJob]
+            The type of job to find.
+        state : JobStateEnum
+            The state of the jobs to find.
+
+        Returns
+        -------
+        List[str]
+            The job ids in queue order.
+        """
+        return [i for t in self._types(job_type) for i in self._buckets[t][state]]
+
+    def set_state(self, job_id: str, state: JobStateEnum, front: bool = False):
+        """Move a job to a new state.
+
+        Parameters
+        ----------
+        job_id : str
+            The id of the job to move.
+        state : JobStateEnum
+            The state to move the job to.
+        front : bool, optional
+            Place the job at the front of its new bucket, by default False.
+        """
+        job = self._jobs[job_id]
+        self._unindex(job_id)
+        job.cur_state = state
+        self._index(job_id)
+        if front:
+            self._bucket(type(job), state).move_to_end(job_id, last=False)
+
+    def pop_new(
+        self, job_type: Type[GenerationJob], client_id: str
+    ) -> GenerationJob | None:
+        """Lease the oldest new job of a type to a client and return it.
+
+        The job timestamp is set to the lease time so it measures the lease.
+
+        Parameters
+        ----------
+        job_type : Type[GenerationJob]
+            The type of job to find.
+        client_id : str
+            The client leasing the job.
+
+        Returns
+        -------
+        GenerationJob | None
+            The leased job or None if there are no new jobs.
+        """
+        for t in self._types(job_type):
+            bucket = self._buckets[t][JobStateEnum.new]
+            if bucket:
+                job_id = next(iter(bucket))
+                job = self._jobs[job_id]
+                self._unindex(job_id)
+                job.cur_state = JobStateEnum.pending
+                job.client_id = client_id
+                job.timestamp = datetime.now(timezone.utc)
+                self._index(job_id)
+                return job
+        return None
+
+    def _is_live_lease(self, lease: Tuple[datetime, int, str]) -> bool:
+        """Check that a heap entry is the current lease of a pending job."""
+        start, _, job_id = lease
+        job = self._jobs.get(job_id)
+        return (
+            job is not None
+            and job.cur_state == JobStateEnum.pending
+            and job.timestamp == start
+        )
+
+    def next_lease_start(self) -> datetime | None:
+        """Return the start of the oldest live lease.
+
+        Returns
+        -------
+        datetime | None
+            The lease start or None if no job is pending.
+        """
+        while self._leases and not self._is_live_lease(self._leases[0]):
+            heapq.heappop(self._leases)
+        return self._leases[0][0] if self._leases else None
+
+    def pop_expired(self, cutoff: datetime) -> List[str]:
+        """Remove and return the ids of pending jobs leased at or before cutoff.
+
+        Parameters
+        ----------
+        cutoff : datetime
+            The latest lease start that is expired.
+
+        Returns
+        -------
+        List[str]
+            The expired job ids, oldest lease first.
+        """
+        expired = []
+        while self._leases and self._leases[0][0] <= cutoff:
+            lease = heapq.heappop(self._leases)
+            if self._is_live_lease(lease):
+                expired.append(lease[2])
+        return expired
+
+    def count(self, job_type: Type[GenerationJob], state: JobStateEnum) -> int:
+        """Return the number of jobs of a type in a state.
+
+        Parameters
+        ----------
+        job_type : Type[GenerationJob]
+            The type of job to count.
+        state : JobStateEnum
+            The state of the jobs to count.
+
+        Returns
+        -------
+        int
+            The count.
+        """
+        return sum(len(self._buckets[t][state]) for t in self._types(job_type))
+
+    def client_counts(self, job_type: Type[GenerationJob]) -> Dict[str, Counter]:
+        """Return the number of jobs of a type per client and state.
+
+        Parameters
+        ----------
+        job_type : Type[GenerationJob]
+            The type of job to count.
+
+        Returns
+        -------
+        Dict[str, Counter]
+            A counter of job states for each client id.
+        """
+        counts: Dict[str, Counter] = dict()
+        for t in self._types(job_type):
+            for client_id, counter in self._client_counts[t].items():
+                counts.setdefault(client_id, Counter()).update(counter)
+        return counts
+
+
+_job_queue: JobQueue = JobQueue()
+
+_mongo_job_queue: MongoJobQueue | None = None
 
 jq_semaphore: asyncio.Lock = asyncio.Lock()
 task_semaphore: asyncio.Lock = asyncio.Lock()
+lease_event: asyncio.Event = asyncio.Event()
 
 
-async def aiterjq():
-    """sdfsdfsdf."""
-    for i in _job_queue:
-        yield i
+def init_backend():
+    """Select the job queue backend from the configuration.
+
+    Setting ``job-queue.backend`` to ``mongo`` stores the queue in the
+    ``job-queue.col-name`` collection (default ``job_queue``) so it survives
+    restarts and can be shared by several API processes. Otherwise the queue
+    is held in memory.
+    """
+    global _mongo_job_queue
+    jq_cfg = config_store.cfg_dict["job-queue"]
+    if jq_cfg.get("backend", "memory") == "mongo":
+        _mongo_job_queue = MongoJobQueue(dbc.db[jq_cfg.get("col-name", "job_queue")])
+    else:
+        _mongo_job_queue = None
 
 
-async def _get_count(job_type: Type[GenerationJob] = GenerationJob) -> int:
+def _get_count(job_type: Type[GenerationJob] = GenerationJob) -> int:
     """Get the number of jobs from the queue.
 
     Parameters
@@ -38,12 +281,10 @@ async def _get_count(job_type: Type[GenerationJob] = GenerationJob) -> int:
     int
         The count.
     """
-    return len(
-        [i async for i in aiter(aiterjq()) if isinstance(_job_queue[i], job_type)]
-    )
+    return sum(_job_queue.count(job_type, state) for state in JobStateEnum)
 
 
-async def _get_count_new(job_type: Type[GenerationJob] = GenerationJob) -> int:
+def _get_count_new(job_type: Type[GenerationJob] = GenerationJob) -> int:
     """Get the number of jobs from the queue in the 'new' state.
 
     Parameters
@@ -56,17 +297,10 @@ async def _get_count_new(job_type: Type[GenerationJob] = GenerationJob) -> int:
     int
         The count.
     """
-    return len(
-        [
-            i
-            async for i in aiter(aiterjq())
-            if isinstance(_job_queue[i], job_type)
-            and _job_queue[i].cur_state == JobStateEnum.new
-        ]
-    )
+    return _job_queue.count(job_type, JobStateEnum.new)
 
 
-async def _get_count_complete(job_type: Type[GenerationJob] = GenerationJob) -> int:
+def _get_count_complete(job_type: Type[GenerationJob] = GenerationJob) -> int:
     """Get the number of jobs from the queue in the 'complete' state.
 
     Parameters
@@ -79,17 +313,10 @@ async def _get_count_complete(job_type: Type[GenerationJob] = GenerationJob) ->
     int
         The count.
     """
-    return len(
-        [
-            i
-            async for i in aiter(aiterjq())
-            if isinstance(_job_queue[i], job_type)
-            and _job_queue[i].cur_state == JobStateEnum.complete
-        ]
-    )
+    return _job_queue.count(job_type, JobStateEnum.complete)
 
 
-async def _get_count_pending(job_type: Type[GenerationJob] = GenerationJob) -> int:
+def _get_count_pending(job_type: Type[GenerationJob] = GenerationJob) -> int:
     """Get the number of jobs from the queue in the 'pending' state.
 
     Parameters
@@ -102,75 +329,79 @@ async def _get_count_pending(job_type: Type[GenerationJob] = GenerationJob) -> i
     int
         The count.
     """
-    return len(
-        [
-            i
-            async for i in aiter(aiterjq())
-            if isinstance(_job_queue[i], job_type)
-            and _job_queue[i].cur_state == JobStateEnum.pending
-        ]
-    )
-
+    return _job_queue.count(job_type, JobStateEnum.pending)
 
-def _is_above_time_delta(then: datetime) -> bool:
-    """Check if the time between now and then is below or above threshold.
 
-    Parameters
-    ----------
-    then : datetime
-        The timestamp from "then".
+async def _clean_stale_jobs():
+    """Clean job queue of stale jobs.
 
-    Returns
-    -------
-    bool
-        ``True`` if above threshold ``False`` otherwise.
+    Only pending jobs whose lease has expired are popped from the lease heap and
+    set back to new.
     """
-    now = datetime.now(timezone.utc)
-    diff = now - then
-    if diff.total_seconds() >= config_store.cfg_dict["job-queue"]["clocks"]["stale"]:
-        return True
-    return False
-
-
-async def _clean_stale_jobs():
-    """Clean job queue of stale jobs."""
-    global _job_queue
     logger.debug("Clean stale jobs.")
 
     async with task_semaphore:
+        if _mongo_job_queue:
+            await _mongo_job_queue.requeue_stale()
+            return
+        stale = config_store.cfg_dict["job-queue"]["clocks"]["stale"]
         async with jq_semaphore:
-            items: List[GenerationJob] = [
-                _job_queue[i]
-                async for i in aiter(aiterjq())
-                if (_is_above_time_delta(_job_queue[i].timestamp))
-                and (_job_queue[i].cur_state != JobStateEnum.complete)
-            ]
-        for item in items:
-            item.cur_state = JobStateEnum.new
+            items: List[str] = _job_queue.pop_expired(
+                datetime.now(timezone.utc) - timedelta(seconds=stale)
+            )
+            for i in reversed(items):
+                _job_queue.set_state(i, JobStateEnum.new, front=True)
+
+
+def _seconds_to_next_stale() -> float:
+    """Return the time until the oldest lease expires.
+
+    Returns
+    -------
+    float
+        The seconds until the next lease expires, at most the stale clock.
+    """
+    stale = config_store.cfg_dict["job-queue"]["clocks"]["stale"]
+    if _mongo_job_queue or (start := _job_queue.next_lease_start()) is None:
+        return stale
+    expires = start + timedelta(seconds=stale) - datetime.now(timezone.utc)
+    return min(max(expires.total_seconds(), 0), stale)
 
 
 async def _clean_complete_jobs():
-    """Store complete jobs into DB."""
-    global _job_queue
+    """Store complete jobs into DB.
+
+    Complete jobs are grouped by type and each group is flushed with a single
+    call to the type's ``store_many``. Jobs that were not stored stay complete
+    in the queue and are flushed again on the next call.
+    """
     async with task_semaphore:
+        if _mongo_job_queue:
+            await _mongo_job_queue.flush_complete()
+            return
         async with jq_semaphore:
-            items: List[GenerationJob] = [
-                _job_queue[i]
-                async for i in aiter(aiterjq())
-                if _job_queue[i].cur_state == JobStateEnum.complete
-            ]
-        logger.info(f"Storing {len(items)} jobs.")
-        for item in items:
+            groups: Dict[Type[GenerationJob], List[GenerationJob]] = dict()
+            for i in _job_queue.ids(GenerationJob, JobStateEnum.complete):
+                groups.setdefault(type(_job_queue[i]), list()).append(_job_queue[i])
+        logger.info(f"Storing {sum(len(g) for g in groups.values())} jobs.")
+        for job_type, items in groups.items():
             try:
-                await item.store()
-                del _job_queue[item.job_id]
+                stored = await job_type.store_many(items)
+                for item, ok in zip(items, stored):
+                    if ok:
+                        del _job_queue[item.job_id]
+                if not all(stored):
+                    logger.error(
+                        f"{stored.count(False)} {job_type.__name__} jobs not stored, "
+                        "retrying on the next flush."
+                    )
             except Exception as e:
-                logger.error(f"Exception while processing job {item.job_id}: {e}")
+                logger.error(f"Exception while processing {job_type.__name__}: {e}")
                 pass
 
 
-async def mark_job_complete(results: GenerationJobResults, current_user: User) -> bool:
-    """Mark job in queue as complete.
+def _mark_job_complete(results: GenerationJobResults, current_user: User) -> bool:
+    """Mark job in queue as complete, the caller must hold the queue lock.
 
     Parameters
     ----------
@@ -184,8 +415,6 @@ async def mark_job_complete(results: GenerationJobResults, current_user: User) -
     bool
         ``True`` if successfully marked complete ``False`` otherwise.
     """
-    global _job_queue
-    logger.debug("Mark job complete.")
     marked = False
     if (
         results.job_id in _job_queue
@@ -194,12 +423,61 @@ async def mark_job_complete(results: GenerationJobResults, current_user: User) -
     ):
         job: GenerationJob = _job_queue[results.job_id]
         job.update_results(results)
-        job.cur_state = JobStateEnum.complete
+        _job_queue.set_state(results.job_id, JobStateEnum.complete)
         marked = True
     # @@@IMPROVEMENT: should add logging here.
     return marked
 
 
+async def mark_job_complete(results: GenerationJobResults, current_user: User) -> bool:
+    """Mark job in queue as complete.
+
+    Parameters
+    ----------
+    results : GenerationJobResults
+        The reported results from the user.
+    current_user : User
+        The user submitting the results.
+
+    Returns
+    -------
+    bool
+        ``True`` if successfully marked complete ``False`` otherwise.
+    """
+    logger.debug("Mark job complete.")
+    if _mongo_job_queue:
+        return (await _mongo_job_queue.complete([results], current_user))[0]
+    async with jq_semaphore:
+        return _mark_job_complete(results, current_user)
+
+
+async def mark_jobs_complete(
+    results: List[GenerationJobResults], current_user: User
+) -> List[bool]:
+    """Mark a batch of jobs in queue as complete.
+
+    All jobs are marked under a single hold of the queue lock.
+
+    Parameters
+    ----------
+    results : List[GenerationJobResults]
+        The reported results from the user.
+    current_user : User
+        The user submitting the results.
+
+    Returns
+    -------
+    List[bool]
+        For each result ``True`` if successfully marked complete ``False``
+        otherwise.
+    """
+    logger.debug(f"Mark {len(results)} jobs complete.")
+    if _mongo_job_queue:
+        return await _mongo_job_queue.complete(results, current_user)
+    async with jq_semaphore:
+        return [_mark_job_complete(res, current_user) for res in results]
+
+
 async def get_next_job(
     job_type: Type[GenerationJob], current_user: User
 ) -> GenerationJob | None:
@@ -217,20 +495,44 @@ async def get_next_job(
     GenerationJob | None
         The job to feed the user or None if none exist.
     """
-    global _job_queue
-    job = None
-    async with jq_semaphore:
-        items = [
-            i
-            async for i in aiter(aiterjq())
-            if isinstance(_job_queue[i], job_type)
-            and _job_queue[i].cur_state == JobStateEnum.new
-        ]
-        if len(items) > 0:
-            _job_queue[items[0]].cur_state = JobStateEnum.pending
-            _job_queue[items[0]].client_id = current_user.username
-            job = _job_queue[items[0]]
-    return job
+    jobs = await get_next_jobs(job_type, current_user, 1)
+    return jobs[0] if jobs else None
+
+
+async def get_next_jobs(
+    job_type: Type[GenerationJob], current_user: User, count: int
+) -> List[GenerationJob]:
+    """Get up to ``count`` jobs to complete from the job queue.
+
+    All jobs are leased under a single hold of the queue lock. ``lease_event``
+    is set when any job is leased so producers can refill the queue.
+
+    Parameters
+    ----------
+    job_type : Type[generation_job]
+        The type of job to find in the queue.
+    current_user : User
+        The user requesting the jobs.
+    count : int
+        The maximum number of jobs to lease.
+
+    Returns
+    -------
+    List[GenerationJob]
+        The jobs to feed the user, empty if none exist.
+    """
+    if _mongo_job_queue:
+        jobs = await _mongo_job_queue.lease(job_type, current_user, count)
+    else:
+        jobs = []
+        async with jq_semaphore:
+            while len(jobs) < count and (
+                job := _job_queue.pop_new(job_type, current_user.username)
+            ):
+                jobs.append(job)
+    if jobs:
+        lease_event.set()
+    return jobs
 
 
 async def enqueue_job(job: GenerationJob) -> bool:
@@ -246,7 +548,8 @@ async def enqueue_job(job: GenerationJob) -> bool:
     bool
         ``True`` if job is enqueued ``False`` otherwise.
     """
-    global _job_queue
+    if _mongo_job_queue:
+        return await _mongo_job_queue.enqueue(job)
     enqueued = False
     async with jq_semaphore:
         if job.job_id not in _job_queue:
@@ -255,31 +558,66 @@ async def enqueue_job(job: GenerationJob) -> bool:
     return enqueued
 
 
-async def get_job_statistics(job_type: Type[GenerationJob] = GenerationJob) -> dict:
+async def is_enqueued(job_id: str) -> bool:
+    """Check if a job is in the queue.
+
+    Parameters
+    ----------
+    job_id : str
+        The id of the job.
+
+    Returns
+    -------
+    bool
+        ``True`` if the job is in the queue ``False`` otherwise.
+    """
+    if _mongo_job_queue:
+        return await _mongo_job_queue.contains(job_id)
+    return job_id in _job_queue
+
+
+async def get_job_statistics(
+    job_type: Type[GenerationJob] = GenerationJob, by_client: bool = False
+) -> dict:
     """Get all job statistics.
 
+    The counts of the in memory queue are maintained on every state transition
+    so no scan or lock is needed to read them.
+
     Parameters
     ----------
     job_type : Type[GenerationJob], optional
         The type of job to find, by default GenerationJob.
+    by_client : bool, optional
+        Include a per client breakdown of the counts, by default False.
 
     Returns
     -------
     dict
         The queue statistics for the type.
     """
-    return {
-        "queue_length": await _get_count(job_type),
-        "new": await _get_count_new(job_type),
-        "pending": await _get_count_pending(job_type),
-        "complete": await _get_count_complete(job_type),
+    if _mongo_job_queue:
+        return await _mongo_job_queue.statistics(job_type, by_client)
+    stats = {
+        "queue_length": _get_count(job_type),
+        "new": _get_count_new(job_type),
+        "pending": _get_count_pending(job_type),
+        "complete": _get_count_complete(job_type),
     }
+    if by_client:
+        stats["clients"] = {
+            (client_id if client_id is not None else "unassigned"): {
+                state.value: counter[state] for state in JobStateEnum
+            }
+            for client_id, counter in _job_queue.client_counts(job_type).items()
+        }
+    return stats
 
 
 async def task_clean_stale_jobs():
-    """Task that periodically cleans stale jobs from the queue."""
+    """Task that cleans stale jobs from the queue as their leases expire."""
     while True:
-        await asyncio.sleep(config_store.cfg_dict["job-queue"]["clocks"]["stale"])
+        await asyncio.sleep(_seconds_to_next_stale())
         await _clean_stale_jobs()
 
 
@@ -0,0 +1,372 @@
+"""Mongo Job Queue is a durable job queue backend stored in a mongodb collection.
+
+Jobs are leased with atomic ``find_one_and_update`` calls so several API processes
+and hosts can share one queue without handing out the same job twice.
+"""
+
+from ..interfaces.job import GenerationJob, GenerationJobResults, JobStateEnum
+from ..internal.security import User
+from . import config_store
+
+from typing import Dict, Type, List
+from datetime import datetime, timedelta, timezone
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger("uvicorn")
+
+
+def _type_name(job_type: Type[GenerationJob]) -> str:
+    """Return the qualified name a job type is stored under.
+
+    Parameters
+    ----------
+    job_type : Type[GenerationJob]
+        The job type.
+
+    Returns
+    -------
+    str
+        The module and qualified class name.
+    """
+    return f"{job_type.__module__}.{job_type.__qualname__}"
+
+
+def _job_types(job_type: Type[GenerationJob]) -> Dict[str, Type[GenerationJob]]:
+    """Return ``job_type`` and all of its subclasses by qualified name.
+
+    Parameters
+    ----------
+    job_type : Type[GenerationJob]
+        The root type.
+
+    Returns
+    -------
+    Dict[str, Type[GenerationJob]]
+        The types keyed by qualified name.
+    """
+    types = {_type_name(job_type): job_type}
+    for sub in job_type.__subclasses__():
+        types.update(_job_types(sub))
+    return types
+
+
+class MongoJobQueue:
+    """A job queue backed by a mongodb collection.
+
+    Each document holds one job with its type name, state, client and lease
+    expiry. The job itself is stored with ``GenerationJob.to_document``.
+    """
+
+    def __init__(self, col: AsyncIOMotorCollection):
+        """Initialize the queue on a collection.
+
+        Parameters
+        ----------
+        col : AsyncIOMotorCollection
+            The collection to hold the jobs.
+        """
+        self._col = col
+        self._indexed = False
+
+    async def _ensure_indexes(self):
+        """Create the lease and state indexes on first use."""
+        if not self._indexed:
+            await self._col.create_index(
+                [("job_type", ASCENDING), ("state", ASCENDING), ("enqueued", ASCENDING)]
+            )
+            await self._col.create_index(
+                [("state", ASCENDING), ("lease_expire", ASCENDING)]
+            )
+            self._indexed = True
+
+    @staticmethod
+    def _load(doc: dict) -> GenerationJob:
+        """Build a job from a queue document.
+
+        Parameters
+        ----------
+        doc : dict
+            The queue document.
+
+        Returns
+        -------
+        GenerationJob
+            The job with the state and client of the document.
+        """
+        job = _job_types(GenerationJob)[doc["job_type"]].from_document(doc["job"])
+        job.cur_state = JobStateEnum(doc["state"])
+        job.client_id = doc.get("client_id")
+        return job
+
+    async def enqueue(self, job: GenerationJob) -> bool:
+        """Add a job to the queue.
+
+        Parameters
+        ----------
+        job : GenerationJob
+            The job to add to the queue.
+
+        Returns
+        -------
+        bool
+            ``True`` if job is enqueued ``False`` otherwise.
+        """
+        await self._ensure_indexes()
+        try:
+            await self._col.insert_one(
+                {
+                    "_id": job.job_id,
+                    "job_type": _type_name(type(job)),
+                    "state": job.cur_state.value,
+                    "client_id": job.client_id,
+                    "enqueued": datetime.now(timezone.utc),
+                    "lease_expire": None,
+                    "job": job.to_document(),
+                }
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def contains(self, job_id: str) -> bool:
+        """Return if a job is in the queue.
+
+        Parameters
+        ----------
+        job_id : str
+            The id of the job.
+
+        Returns
+        -------
+        bool
+            ``True`` if the job is in the queue ``False`` otherwise.
+        """
+        return (await self._col.find_one({"_id": job_id}, {"_id": 1})) is not None
+
+    async def lease(
+        self, job_type: Type[GenerationJob], current_user: User, count: int
+    ) -> List[GenerationJob]:
+        """Lease up to ``count`` new jobs of a type to a user.
+
+        Parameters
+        ----------
+        job_type : Type[GenerationJob]
+            The type of job to find in the queue.
+        current_user : User
+            The user requesting the jobs.
+        count : int
+            The maximum number of jobs to lease.
+
+        Returns
+        -------
+        List[GenerationJob]
+            The leased jobs.
+        """
+        await self._ensure_indexes()
+        stale = config_store.cfg_dict["job-queue"]["clocks"]["stale"]
+        jobs = []
+        while len(jobs) < count:
+            now = datetime.now(timezone.utc)
+            doc = await self._col.find_one_and_update(
+                {
+                    "job_type": {"$in": list(_job_types(job_type))},
+                    "state": JobStateEnum.new.value,
+                },
+                {
+                    "$set": {
+                        "state": JobStateEnum.pending.value,
+                        "client_id": current_user.username,
+                        "lease_expire": now + timedelta(seconds=stale),
+                        "job.fields.timestamp": now.isoformat(),
+                    }
+                },
+                sort=[("enqueued", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is None:
+                break
+            jobs.append(self._load(doc))
+        return jobs
+
+    async def _complete(self, doc: dict, results: GenerationJobResults) -> bool:
+        """Store the results of a leased job and mark it complete.
+
+        Parameters
+        ----------
+        doc : dict
+            The queue document of the job.
+        results : GenerationJobResults
+            The reported results.
+
+        Returns
+        -------
+        bool
+            ``True`` if the job was still leased to the client.
+        """
+        job = self._load(doc)
+        job.update_results(results)
+        res = await self._col.update_one(
+            {
+                "_id": doc["_id"],
+                "state": JobStateEnum.pending.value,
+                "client_id": doc["client_id"],
+            },
+            {
+                "$set": {
+                    "state": JobStateEnum.complete.value,
+                    "lease_expire": None,
+                    "job": job.to_document(),
+                }
+            },
+        )
+        return res.modified_count == 1
+
+    async def complete(
+        self, results: List[GenerationJobResults], current_user: User
+    ) -> List[bool]:
+        """Mark a batch of jobs complete.
+
+        Parameters
+        ----------
+        results : List[GenerationJobResults]
+            The reported results from the user.
+        current_user : User
+            The user submitting the results.
+
+        Returns
+        -------
+        List[bool]
+            For each result ``True`` if successfully marked complete ``False``
+            otherwise.
+        """
+        docs = {
+            doc["_id"]: doc
+            async for doc in self._col.find(
+                {
+                    "_id": {"$in": [res.job_id for res in results]},
+                    "state": JobStateEnum.pending.value,
+                    "client_id": current_user.username,
+                }
+            )
+        }
+
+        async def complete_one(res: GenerationJobResults) -> bool:
+            if res.job_id not in docs:
+                return False
+            return await self._complete(docs.pop(res.job_id), res)
+
+        return list(await asyncio.gather(*[complete_one(res) for res in results]))
+
+    async def statistics(self, job_type: Type[GenerationJob], by_client: bool) -> dict:
+        """Get the job statistics for a type.
+
+        Parameters
+        ----------
+        job_type : Type[GenerationJob]
+            The type of job to count.
+        by_client : bool
+            Include a per client breakdown of the counts.
+
+        Returns
+        -------
+        dict
+            The queue statistics for the type.
+        """
+        pipeline = [
+            {"$match": {"job_type": {"$in": list(_job_types(job_type))}}},
+            {
+                "$group": {
+                    "_id": {"state": "$state", "client_id": "$client_id"},
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+        stats = {"queue_length": 0} | {state.value: 0 for state in JobStateEnum}
+        clients = dict()
+        async for group in self._col.aggregate(pipeline):
+            state = group["_id"]["state"]
+            client_id = group["_id"].get("client_id")
+            client_id = client_id if client_id is not None else "unassigned"
+            stats["queue_length"] += group["count"]
+            stats[state] += group["count"]
+            clients.setdefault(
+                client_id, {state.value: 0 for state in JobStateEnum}
+            )[state] += group["count"]
+        if by_client:
+            stats["clients"] = clients
+        return stats
+
+    async def requeue_stale(self) -> int:
+        """Set every pending job with an expired lease back to new.
+
+        Returns
+        -------
+        int
+            The number of requeued jobs.
+        """
+        res = await self._col.update_many(
+            {
+                "state": JobStateEnum.pending.value,
+                "lease_expire": {"$lte": datetime.now(timezone.utc)},
+            },
+            {"$set": {"state": JobStateEnum.new.value, "lease_expire": None}},
+        )
+        return res.modified_count
+
+    async def flush_complete(self):
+        """Store complete jobs into the DB and remove them from the queue.
+
+        Jobs are claimed with a flush token first so only one process stores a
+        job. Claims expire after the complete clock so jobs claimed by a process
+        that died are flushed again. Jobs that were not stored are released and
+        stay complete for the next flush.
+        """
+        now = datetime.now(timezone.utc)
+        token = str(uuid.uuid4())
+        claim_time = config_store.cfg_dict["job-queue"]["clocks"]["complete"]
+        await self._col.update_many(
+            {
+                "state": JobStateEnum.complete.value,
+                "$or": [
+                    {"flush_expire": None},
+                    {"flush_expire": {"$lte": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "flush_token": token,
+                    "flush_expire": now + timedelta(seconds=claim_time),
+                }
+            },
+        )
+        groups: Dict[Type[GenerationJob], List[GenerationJob]] = dict()
+        async for doc in self._col.find({"flush_token": token}):
+            job = self._load(doc)
+            groups.setdefault(type(job), list()).append(job)
+        logger.info(f"Storing {sum(len(g) for g in groups.values())} jobs.")
+        for job_type, items in groups.items():
+            try:
+                stored = await job_type.store_many(items)
+                done = [item.job_id for item, ok in zip(items, stored) if ok]
+                failed = [item.job_id for item, ok in zip(items, stored) if not ok]
+                await self._col.delete_many(
+                    {"_id": {"$in": done}, "flush_token": token}
+                )
+                if failed:
+                    # Release the claim so the next flush stores them again.
+                    await self._col.update_many(
+                        {"_id": {"$in": failed}, "flush_token": token},
+                        {"$set": {"flush_token": None, "flush_expire": None}},
+                    )
+                    logger.error(
+                        f"{stored.count(False)} {job_type.__name__} jobs not stored, "
+                        "retrying on the next flush."
+                    )
+            except Exception as e:
+                logger.error(f"Exception while processing {job_type.__name__}: {e}")
+                pass
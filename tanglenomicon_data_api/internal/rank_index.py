@@ -0,0 +1,389 @@
+"""Rank ordering of tangle classes for random page access.
+
+A ranked tangle class gives each of its tangles a rank field, the position of the
+tangle in ``(crossing_num, _id)`` order. With an index on the rank a page of a
+listing is one range read on the rank however deep it is. The ranks are optional,
+a class is ranked when ``tangle-classes.<class>.rank`` is set in the config. They
+are brought up to date by ``task_rank_tangles`` after ``invalidate`` is called by a
+writer of the class, from the lowest crossing number with new tangles on. Listings
+fall back to walking pages in between.
+"""
+
+from . import config_store
+from dataclasses import dataclass, field
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from typing import Callable, Dict, List, Optional
+import asyncio
+import bisect
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+_BULK_SIZE = 10000
+
+
+@dataclass
+class RankedClass:
+    """A tangle class that can be ranked."""
+
+    name: str
+    get_collection: Callable
+    class_filter: dict
+    offsets: Optional[Dict[int, int]] = None
+    total: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    indexed: bool = False
+    generation: int = 0
+
+    @property
+    def rank_field(self) -> str:
+        """The name of the rank field of the class."""
+        return f"{self.name}_rank"
+
+
+_classes: Dict[str, RankedClass] = dict()
+
+
+def register(name: str, get_collection: Callable, class_filter: dict):
+    """Register a tangle class that can be ranked.
+
+    Parameters
+    ----------
+    name : str
+        The name of the class in ``tangle-classes``.
+    get_collection : Callable
+        Returns the collection of the class.
+    class_filter : dict
+        The filter selecting the tangles of the class in the collection.
+    """
+    if name not in _classes:
+        _classes[name] = RankedClass(name, get_collection, class_filter)
+
+
+def is_enabled(name: str) -> bool:
+    """Return if a class is configured to be ranked.
+
+    Parameters
+    ----------
+    name : str
+        The name of the class.
+
+    Returns
+    -------
+    bool
+        ``True`` if the class is registered and ranked in the config.
+    """
+    return name in _classes and bool(
+        config_store.cfg_dict["tangle-classes"].get(name, dict()).get("rank", False)
+    )
+
+
+async def _rank(ranked: RankedClass, crossing_num_min: int = 0):
+    """Write the ranks of the tangles of a class from a crossing number on.
+
+    The ranks below ``crossing_num_min`` are kept, only the offsets of those
+    crossing numbers are counted. The tangles from it on are read in
+    ``(crossing_num, _id)`` order and the ranks that changed are written in bulks
+    while the cursor is read, so the memory used does not grow with the size of
+    the class and unchanged ranks are not written again.
+
+    Parameters
+    ----------
+    ranked : RankedClass
+        The class to rank.
+    crossing_num_min : int, optional
+        The lowest crossing number whose ranks may be out of date, by default 0.
+    """
+    tangle_col = ranked.get_collection()
+    offsets = dict()
+    rank = 0
+    async for group in tangle_col.aggregate(
+        [
+            {
+                "$match": ranked.class_filter
+                | {"crossing_num": {"$lt": crossing_num_min}}
+            },
+            {"$group": {"_id": "$crossing_num", "count": {"$sum": 1}}},
+            {"$sort": {"_id": ASCENDING}},
+        ]
+    ):
+        offsets[group["_id"]] = rank
+        rank += group["count"]
+    updates = []
+    async for tang in (
+        tangle_col.find(
+            ranked.class_filter | {"crossing_num": {"$gte": crossing_num_min}},
+            {"crossing_num": 1, ranked.rank_field: 1},
+        )
+        .sort([("crossing_num", ASCENDING), ("_id", ASCENDING)])
+        .batch_size(_BULK_SIZE)
+    ):
+        offsets.setdefault(tang["crossing_num"], rank)
+        if tang.get(ranked.rank_field) != rank:
+            updates.append(
+                UpdateOne({"_id": tang["_id"]}, {"$set": {ranked.rank_field: rank}})
+            )
+        if len(updates) == _BULK_SIZE:
+            await tangle_col.bulk_write(updates, ordered=False)
+            updates = []
+        rank += 1
+    if updates:
+        await tangle_col.bulk_write(updates, ordered=False)
+    ranked.offsets = offsets
+    ranked.total = rank
+
+
+async def _stale_crossing_num(ranked: RankedClass) -> int:
+    """Return the lowest crossing number of a class whose ranks may be out of date.
+
+    Inserting a tangle only moves the ranks of its crossing number and the ones
+    above it, so ranking starts at the lowest crossing number of an unranked
+    tangle. Without one the ranks are not dense and all of them are written.
+
+    Parameters
+    ----------
+    ranked : RankedClass
+        The class to check.
+
+    Returns
+    -------
+    int
+        The crossing number to rank from.
+    """
+    unranked = await ranked.get_collection().find_one(
+        ranked.class_filter | {ranked.rank_field: {"$exists": False}},
+        {"crossing_num": 1},
+        sort=[("crossing_num", ASCENDING)],
+    )
+    return unranked["crossing_num"] if unranked else 0
+
+
+async def _is_stale(ranked: RankedClass) -> bool:
+    """Return if the ranks of a class in memory are behind the database.
+
+    Tangles written by another process or outside the API do not invalidate the
+    ranks of this process. They are found as unranked tangles, or once another
+    process ranked them as a highest rank that does not match the total in memory.
+
+    Parameters
+    ----------
+    ranked : RankedClass
+        The class to check.
+
+    Returns
+    -------
+    bool
+        ``True`` if the class is ranked in memory and out of date.
+    """
+    if ranked.offsets is None:
+        return False
+    tangle_col = ranked.get_collection()
+    if await tangle_col.find_one(
+        ranked.class_filter | {ranked.rank_field: {"$exists": False}}, {"_id": 1}
+    ):
+        return True
+    last = await tangle_col.find_one(
+        ranked.class_filter,
+        {ranked.rank_field: 1},
+        sort=[(ranked.rank_field, DESCENDING)],
+    )
+    return (last[ranked.rank_field] + 1 if last else 0) != ranked.total
+
+
+async def _load_offsets(ranked: RankedClass) -> bool:
+    """Load the offsets of the crossing numbers of a class.
+
+    Parameters
+    ----------
+    ranked : RankedClass
+        The class to load.
+
+    Returns
+    -------
+    bool
+        ``True`` if the ranks are dense and complete ``False`` otherwise.
+    """
+    tangle_col = ranked.get_collection()
+    if await tangle_col.find_one(
+        ranked.class_filter | {ranked.rank_field: {"$exists": False}}, {"_id": 1}
+    ):
+        return False
+    counts = {
+        group["_id"]: group["count"]
+        async for group in tangle_col.aggregate(
+            [
+                {"$match": ranked.class_filter},
+                {"$group": {"_id": "$crossing_num", "count": {"$sum": 1}}},
+            ]
+        )
+    }
+    total = sum(counts.values())
+    if total:
+        last = await tangle_col.find_one(
+            ranked.class_filter,
+            {ranked.rank_field: 1},
+            sort=[(ranked.rank_field, DESCENDING)],
+        )
+        if last[ranked.rank_field] != total - 1:
+            return False
+    offsets = dict()
+    offset = 0
+    for crossing_num in sorted(counts):
+        offsets[crossing_num] = offset
+        offset += counts[crossing_num]
+    ranked.offsets = offsets
+    ranked.total = total
+    return True
+
+
+async def ensure_ranked(name: str):
+    """Rank a class if its ranks are missing or out of date.
+
+    Parameters
+    ----------
+    name : str
+        The name of the class.
+    """
+    ranked = _classes[name]
+    if ranked.offsets is not None:
+        return
+    async with ranked.lock:
+        if ranked.offsets is not None:
+            return
+        tangle_col = ranked.get_collection()
+        if not ranked.indexed:
+            await tangle_col.create_index([(ranked.rank_field, ASCENDING)])
+            ranked.indexed = True
+        generation = ranked.generation
+        if not await _load_offsets(ranked):
+            await _rank(ranked, await _stale_crossing_num(ranked))
+            logger.info(f"Ranked {ranked.total} {name} tangles.")
+        if ranked.generation != generation:
+            # Tangles were written while ranking, rank again on the next call.
+            ranked.offsets = None
+
+
+def invalidate(name: str = None):
+    """Forget the ranks of a class, or of all classes.
+
+    Call this after tangles of the class are inserted, listings walk pages until
+    the class is ranked again. Forgetting all classes also resets the index state,
+    as done when the database connection changes.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the class to forget, by default all.
+    """
+    for ranked in _classes.values() if name is None else [_classes.get(name)]:
+        if ranked is None:
+            continue
+        ranked.offsets = None
+        ranked.total = 0
+        ranked.generation += 1
+        if name is None:
+            ranked.indexed = False
+            ranked.lock = asyncio.Lock()
+
+
+def start_rank(name: str, crossing_num_min: int) -> Optional[int]:
+    """Return the rank of the first tangle of a class at a crossing number.
+
+    Parameters
+    ----------
+    name : str
+        The name of the class.
+    crossing_num_min : int
+        The lowest crossing number of the listing.
+
+    Returns
+    -------
+    Optional[int]
+        The rank of the first tangle with at least ``crossing_num_min`` crossings,
+        ``None`` if the class is not ranked.
+    """
+    ranked = _classes.get(name)
+    if ranked is None or ranked.offsets is None or not is_enabled(name):
+        return None
+    crossing_nums = sorted(ranked.offsets)
+    idx = bisect.bisect_left(crossing_nums, crossing_num_min)
+    if idx == len(crossing_nums):
+        return ranked.total
+    return ranked.offsets[crossing_nums[idx]]
+
+
+def counts(name: str) -> Optional[Dict[int, int]]:
+    """Return the number of tangles of a class at each crossing number.
+
+    Parameters
+    ----------
+    name : str
+        The name of the class.
+
+    Returns
+    -------
+    Optional[Dict[int, int]]
+        The counts by crossing number, ``None`` if the class is not ranked.
+    """
+    ranked = _classes.get(name)
+    if ranked is None or ranked.offsets is None or not is_enabled(name):
+        return None
+    crossing_nums = sorted(ranked.offsets)
+    bounds = [ranked.offsets[cn] for cn in crossing_nums[1:]] + [ranked.total]
+    return {cn: bound - ranked.offsets[cn] for cn, bound in zip(crossing_nums, bounds)}
+
+
+async def get_page(
+    name: str, start: int, page_size: int, projection: dict = None
+) -> List[dict]:
+    """Return the tangles of a class with ranks in a range.
+
+    Parameters
+    ----------
+    name : str
+        The name of the class.
+    start : int
+        The rank of the first tangle.
+    page_size : int
+        The number of tangles.
+    projection : dict, optional
+        The fields to read, by default all.
+
+    Returns
+    -------
+    List[dict]
+        The tangle documents in rank order.
+    """
+    ranked = _classes[name]
+    return (
+        await ranked.get_collection()
+        .find(
+            ranked.class_filter
+            | {ranked.rank_field: {"$gte": start, "$lt": start + page_size}},
+            projection,
+        )
+        .sort(ranked.rank_field, ASCENDING)
+        .to_list(page_size)
+    )
+
+
+async def task_rank_tangles():
+    """Task that ranks the configured tangle classes.
+
+    Classes with ``tangle-classes.<class>.rank`` set are ranked whenever their ranks
+    were invalidated or found out of date in the database, so tangles written by
+    other processes are ranked too. The task checks every
+    ``job-queue.clocks.rank`` seconds.
+    """
+    while True:
+        for name in list(_classes):
+            if is_enabled(name):
+                try:
+                    if await _is_stale(_classes[name]):
+                        invalidate(name)
+                    await ensure_ranked(name)
+                except Exception as e:
+                    logger.error(f"Exception while ranking {name} tangles: {e}")
+        await asyncio.sleep(
+            config_store.cfg_dict["job-queue"]["clocks"].get("rank", 300)
+        )
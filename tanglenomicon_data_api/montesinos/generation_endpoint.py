@@ -5,7 +5,7 @@ from ..internal.security import auth_current_user, get_current_user, User
 from ..interfaces.job import ConfirmJobReceipt
 from . import job as mj
 from ..internal import config_store, job_queue
-from typing import Annotated
+from typing import Annotated, List
 
 router = APIRouter(
     prefix="/montesinos",
@@ -51,6 +51,70 @@ async def _report_job_results(
     return results
 
 
+async def _report_jobs_results(
+    jobs_results: List[mj.MontesinosJobResults],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> List[ConfirmJobReceipt]:
+    """Return a confirmation or denial for each of a batch of job results.
+
+    Parameters
+    ----------
+    jobs_results : List[mj.MontesinosJobResults]
+        The job results reported by a client.
+    current_user : Annotated[User, Depends
+        The user reporting the results.
+
+    Returns
+    -------
+    List[ConfirmJobReceipt]
+        Either a confirmation or denial for each reported job result.
+
+    Raises
+    ------
+    HTTPException
+        Raise a 404 if the batch is larger than the maximum batch count.
+    """
+    max_count = config_store.cfg_dict["job-queue"].get("max-batch-count", 64)
+    if len(jobs_results) > max_count:
+        raise HTTPException(
+            status_code=404, detail=f"Batch must hold at most {max_count} results."
+        )
+    marked = await job_queue.mark_jobs_complete(jobs_results, current_user)
+    return [
+        ConfirmJobReceipt(job_id=res.job_id, accepted=accepted)
+        for res, accepted in zip(jobs_results, marked)
+    ]
+
+
+async def _lease_montesinos_jobs(
+    current_user: User, count: int
+) -> List[mj.MontesinosJob]:
+    """Lease up to ``count`` ready montesinos jobs.
+
+    The queue is kept filled by ``mj.task_fill_job_queue``. Jobs are only built
+    in the request when no job is ready, e.g. right after startup.
+
+    Parameters
+    ----------
+    current_user : User
+        The verified user requesting the jobs.
+    count : int
+        The number of jobs requested.
+
+    Returns
+    -------
+    List[mj.MontesinosJob]
+        The leased jobs, empty if none could be built.
+    """
+    jobs = await job_queue.get_next_jobs(mj.MontesinosJob, current_user, count)
+    if not jobs:
+        await mj.get_jobs(
+            max(config_store.cfg_dict["job-queue"]["min-new-count"], count)
+        )
+        jobs = await job_queue.get_next_jobs(mj.MontesinosJob, current_user, count)
+    return jobs
+
+
 async def _get_next_montesinos_job(
     current_user: Annotated[User, Depends(get_current_user)]
 ) -> mj.MontesinosJob:
@@ -71,17 +135,46 @@ async def _get_next_montesinos_job(
     HTTPException
         If no job found raise 404.
     """
-    new_mont_j_cnt = (await job_queue.get_job_statistics(mj.MontesinosJob))["new"]
-    if new_mont_j_cnt < config_store.cfg_dict["job-queue"]["min-new-count"]:
-        await mj.get_jobs(
-            config_store.cfg_dict["job-queue"]["min-new-count"] - new_mont_j_cnt
-        )
-    job = await job_queue.get_next_job(mj.MontesinosJob, current_user)
+    job = next(iter(await _lease_montesinos_jobs(current_user, 1)), None)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found.")
     return job
 
 
+async def _get_next_montesinos_jobs(
+    current_user: Annotated[User, Depends(get_current_user)],
+    count: int = 1,
+) -> List[mj.MontesinosJob]:
+    """Return up to ``count`` montesinos jobs from the job queue.
+
+    Parameters
+    ----------
+    current_user : Annotated[User, Depends
+        The verified user requesting the jobs.
+    count : int, optional
+        The number of jobs requested, by default 1.
+
+    Returns
+    -------
+    List[mj.MontesinosJob]
+        The next Montesinos Jobs.
+
+    Raises
+    ------
+    HTTPException
+        Raise a 404 if the count is out of range or no job is found.
+    """
+    max_count = config_store.cfg_dict["job-queue"].get("max-batch-count", 64)
+    if not 0 < count <= max_count:
+        raise HTTPException(
+            status_code=404, detail=f"Count must be between 1 and {max_count}."
+        )
+    jobs = await _lease_montesinos_jobs(current_user, count)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return jobs
+
+
 @router.post("/job")
 async def report_montesinos_job(
     response: Annotated[ConfirmJobReceipt, Depends(_report_job_results)],
@@ -101,6 +194,25 @@ async def report_montesinos_job(
     return response
 
 
+@router.post("/jobs")
+async def report_montesinos_jobs(
+    response: Annotated[List[ConfirmJobReceipt], Depends(_report_jobs_results)],
+) -> List[ConfirmJobReceipt]:
+    """Return a batch of jobs from a client.
+
+    Parameters
+    ----------
+    response : Annotated[List[ConfirmJobReceipt], Depends
+        The confirmation state of each reported job.
+
+    Returns
+    -------
+    List[ConfirmJobReceipt]
+        The confirmation state of each reported job.
+    """
+    return response
+
+
 @router.get("/job", response_model=mj.MontesinosJob)
 async def retrieve_montesinos_job(
     next_job: Annotated[mj.MontesinosJob, Depends(_get_next_montesinos_job)]
@@ -118,3 +230,22 @@ async def retrieve_montesinos_job(
         The next Montesinos Job.
     """
     return next_job
+
+
+@router.get("/jobs", response_model=List[mj.MontesinosJob])
+async def retrieve_montesinos_jobs(
+    next_jobs: Annotated[List[mj.MontesinosJob], Depends(_get_next_montesinos_jobs)],
+):
+    """Return a batch of montesinos jobs.
+
+    Parameters
+    ----------
+    next_jobs : Annotated[List[mj.MontesinosJob], Depends
+        The next Montesinos Jobs.
+
+    Returns
+    -------
+    List[MontesinosJob]
+        The next Montesinos Jobs.
+    """
+    return next_jobs
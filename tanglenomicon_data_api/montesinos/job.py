@@ -2,16 +2,22 @@
 
 from datetime import datetime, timezone
 from ..interfaces.job import GenerationJob, GenerationJobResults, JobStateEnum
-from ..internal import config_store, job_queue
-from . import orm
-from ..rational import orm as rat_orm
-from typing import List
+from ..internal import config_store, job_queue, rank_index
+from . import orm, symmetry
+from ..rational import page_index
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
 from dacite import from_dict
-from dataclasses import asdict
-import math
+import asyncio
 import copy
+import math
+import sys
 import uuid
-from pymongo import UpdateOne
+import weakref
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from pydantic import BaseModel
 import logging
 
 logger = logging.getLogger("uvicorn")
@@ -28,15 +34,317 @@ STARTED_STEN_FILTER = {
         {"state": {"$ne": orm.StencilStateEnum.new}},
     ]
 }
+# Started stencils always get a page exponent, stencils started without one were
+# planned against the natural page order used before rational pages were ranked.
+UNRANKED_STEN_FILTER = {"$and": [STARTED_STEN_FILTER, {"page_exp": None}]}
+
+_refill: asyncio.Future | None = None
+_refill_demand: int = 0
+
+PageKey = Tuple[int, int, int]
+
+
+class RationalPage(list):
+    """A page of rational tangle ids shared by every job built from it.
+
+    A list subclass so the page cache can hold pages weakly.
+    """
+
+
+class PageCache:
+    """A bounded LRU cache of rational pages.
+
+    Pages are keyed by crossing number, page and page exponent. The cache holds
+    pages until their estimated size exceeds ``max_bytes``, then evicts the least
+    recently used pages. Every page is also interned weakly, so a page evicted
+    from the LRU is still shared for as long as a queued job holds it. Cached
+    pages are shared between jobs and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The memory budget of the cache in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = page_index.generation
+        self._pages: OrderedDict[PageKey, Tuple[RationalPage, int]] = OrderedDict()
+        self._interned: weakref.WeakValueDictionary[PageKey, RationalPage] = (
+            weakref.WeakValueDictionary()
+        )
+
+    @staticmethod
+    def _page_bytes(page: List[str]) -> int:
+        """Estimate the memory held by a page.
+
+        Parameters
+        ----------
+        page : List[str]
+            The page of tangle ids.
+
+        Returns
+        -------
+        int
+            The estimated size in bytes.
+        """
+        return sys.getsizeof(page) + sum(sys.getsizeof(tang_id) for tang_id in page)
+
+    def clear(self):
+        """Drop every page from the cache."""
+        self._pages.clear()
+        self._interned.clear()
+        self.size = 0
+
+    def get(self, key: PageKey) -> RationalPage | None:
+        """Return a cached page and mark it recently used.
+
+        Parameters
+        ----------
+        key : PageKey
+            The crossing number, page and page exponent.
+
+        Returns
+        -------
+        RationalPage | None
+            The page if cached or held by a job ``None`` otherwise.
+        """
+        if self.generation != page_index.generation:
+            self.clear()
+            self.generation = page_index.generation
+        if key in self._pages:
+            self.hits += 1
+            self._pages.move_to_end(key)
+            return self._pages[key][0]
+        page = self._interned.get(key)
+        if page is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.put(key, page)
+        return page
+
+    def put(self, key: PageKey, page: List[str]) -> RationalPage:
+        """Add a page to the cache and evict pages over the memory budget.
+
+        Parameters
+        ----------
+        key : PageKey
+            The crossing number, page and page exponent.
+        page : List[str]
+            The page of tangle ids.
+
+        Returns
+        -------
+        RationalPage
+            The shared page to hand to jobs.
+        """
+        if not isinstance(page, RationalPage):
+            page = RationalPage(page)
+        self._interned[key] = page
+        page_bytes = self._page_bytes(page)
+        if page_bytes > self.max_bytes:
+            return page
+        if key in self._pages:
+            self.size -= self._pages.pop(key)[1]
+        self._pages[key] = (page, page_bytes)
+        self.size += page_bytes
+        while self.size > self.max_bytes:
+            self.size -= self._pages.popitem(last=False)[1][1]
+        return page
+
+    def statistics(self) -> Dict[str, int]:
+        """Return the cache counters.
+
+        Returns
+        -------
+        Dict[str, int]
+            The hits, misses, cached and interned pages and bytes of the cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pages": len(self._pages),
+            "interned": len(self._interned),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_page_cache: PageCache | None = None
+_stencil_indexed = False
+_job_rates: Dict[int, float] = dict()
+_page_reads: Dict[PageKey, asyncio.Future] = dict()
+
+
+def get_page_cache() -> PageCache:
+    """Return the rational page cache, creating it on first use.
+
+    The memory budget is read from ``tangle-classes.montesinos.page-cache-bytes``.
+
+    Returns
+    -------
+    PageCache
+        The rational page cache.
+    """
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache(
+            config_store.cfg_dict["tangle-classes"]["montesinos"].get(
+                "page-cache-bytes", 64 * 2**20
+            )
+        )
+    return _page_cache
+
+
+async def _ensure_stencil_indexes():
+    """Create the index on the open jobs of the stencils on first use."""
+    global _stencil_indexed
+    if not _stencil_indexed:
+        await orm.get_stencil_collection().create_index(
+            [("open_jobs.job_id", ASCENDING)]
+        )
+        _stencil_indexed = True
 
 
-def _move_head(stencildb: orm.StencilDB) -> orm.StencilHeadStateEnum:
-    """Move the head of the Stencil forward by a page.
+async def _get_page(crossing_num: int, page: int, page_exp: int) -> RationalPage:
+    """Return a page of rational tangle ids through the page cache.
+
+    Concurrent misses on the same page share a single database read.
+
+    Parameters
+    ----------
+    crossing_num : int
+        The crossing number of the tangles.
+    page : int
+        The page to read.
+    page_exp : int
+        The page holds ``2**page_exp`` tangles.
+
+    Returns
+    -------
+    RationalPage
+        The tangle ids of the page, shared with every job holding the page.
+    """
+    cache = get_page_cache()
+    key = (crossing_num, page, page_exp)
+    rat_page = cache.get(key)
+    if rat_page is not None:
+        return rat_page
+    read = _page_reads.get(key)
+    if read is None:
+
+        async def read_page() -> RationalPage:
+            return cache.put(
+                key, await page_index.get_page(crossing_num, page, page_exp)
+            )
+
+        read = _page_reads[key] = asyncio.ensure_future(read_page())
+        read.add_done_callback(lambda _: _page_reads.pop(key, None))
+    return await asyncio.shield(read)
+
+
+def _stencil_page_exp(stencildb: orm.StencilDB) -> int:
+    """Return the page exponent a stencil is paged with.
+
+    Parameters
+    ----------
+    stencildb : orm.StencilDB
+        A stencil from the DB.
+
+    Returns
+    -------
+    int
+        The page exponent recorded on the stencil, or ``page-exp`` for stencils
+        started before page exponents were recorded.
+    """
+    if stencildb.page_exp is not None:
+        return stencildb.page_exp
+    return config_store.cfg_dict["tangle-classes"]["montesinos"]["page-exp"]
+
+
+def _record_job_time(job: "MontesinosJob"):
+    """Record the lease to completion time of a job.
+
+    The time per tangle combination of the job is averaged per crossing number
+    with an exponentially weighted moving average, smoothed by
+    ``tangle-classes.montesinos.rate-smoothing`` (default 0.2).
+
+    Parameters
+    ----------
+    job : MontesinosJob
+        The completed job, its timestamp is the lease time.
+    """
+    leased = job.timestamp
+    if leased.tzinfo is None:
+        leased = leased.replace(tzinfo=timezone.utc)
+    seconds = (datetime.now(timezone.utc) - leased).total_seconds()
+    if job.rat_pages:
+        combinations = math.prod(2**ref.page_exp for ref in job.rat_pages)
+    elif job.rat_lists:
+        combinations = math.prod(len(rat_page) for rat_page in job.rat_lists)
+    else:
+        return
+    if combinations == 0:
+        return
+    rate = seconds / combinations
+    alpha = config_store.cfg_dict["tangle-classes"]["montesinos"].get(
+        "rate-smoothing", 0.2
+    )
+    if job.crossing_num in _job_rates:
+        rate = alpha * rate + (1 - alpha) * _job_rates[job.crossing_num]
+    _job_rates[job.crossing_num] = rate
+
+
+def _choose_page_exp(stencil_array: List[int]) -> int:
+    """Choose the page exponent of a stencil from the recorded job times.
+
+    The largest exponent between ``min-page-exp`` and ``max-page-exp`` whose jobs
+    are expected to finish within ``target-job-seconds`` is chosen. The time per
+    combination of the crossing number, or of the closest smaller crossing
+    number, is used as estimate. Without a target or any recorded time
+    ``page-exp`` is used.
+
+    Parameters
+    ----------
+    stencil_array : List[int]
+        The stencil array.
+
+    Returns
+    -------
+    int
+        The page exponent for the stencil.
+    """
+    mont_cfg = config_store.cfg_dict["tangle-classes"]["montesinos"]
+    target = mont_cfg.get("target-job-seconds")
+    crossing_num = sum(stencil_array)
+    measured = [cn for cn in _job_rates if cn <= crossing_num]
+    if target is None or not measured:
+        return mont_cfg["page-exp"]
+    rate = _job_rates[max(measured)]
+    page_exp = mont_cfg.get("min-page-exp", 0)
+    for exp in range(page_exp, mont_cfg.get("max-page-exp", mont_cfg["page-exp"]) + 1):
+        if rate * 2 ** (exp * len(stencil_array)) <= target:
+            page_exp = exp
+    return page_exp
+
+
+def _step_head(
+    stencildb: orm.StencilDB, page_counts: List[int]
+) -> orm.StencilHeadStateEnum:
+    """Step the head of the Stencil forward by a page.
 
     Parameters
     ----------
     sten : orm.mont_stencil_db
         A stencil from the DB.
+    page_counts : List[int]
+        The number of rational pages of each stencil entry.
 
     Returns
     -------
@@ -45,21 +353,11 @@ def _move_head(stencildb: orm.StencilDB) -> orm.StencilHeadStateEnum:
         page was just completed or No headroom otherwise.
     """
     overflow = True
-    for i, sten_entry in enumerate(stencildb.stencil_array):
+    for i, page_count in enumerate(page_counts):
         if overflow:
             stencildb.head[i] += 1
             overflow = False
-        if (
-            max(
-                0,
-                (
-                    sten_entry
-                    - 2
-                    - config_store.cfg_dict["tangle-classes"]["montesinos"]["page-exp"]
-                ),
-            )
-            < stencildb.head[i]
-        ):
+        if page_count <= stencildb.head[i]:
             stencildb.head[i] = 0
             overflow = True
         else:
@@ -71,7 +369,65 @@ def _move_head(stencildb: orm.StencilDB) -> orm.StencilHeadStateEnum:
     return orm.StencilHeadStateEnum.headroom
 
 
-async def _build_job(stencil: List[int], pages: List[int], job_id: str = None) -> str:
+def _move_head(
+    stencildb: orm.StencilDB, page_counts: List[int]
+) -> orm.StencilHeadStateEnum:
+    """Move the head of the Stencil forward to the next canonical page ordering.
+
+    Heads that a symmetry of the stencil array maps to a smaller head enumerate
+    tangles equivalent to those of the smaller head and are stepped over.
+
+    Parameters
+    ----------
+    sten : orm.mont_stencil_db
+        A stencil from the DB.
+    page_counts : List[int]
+        The number of rational pages of each stencil entry.
+
+    Returns
+    -------
+    orm.HeadState_Enum
+        Returns the current state of the stencil head. Headroom if not the last
+        page was just completed or No headroom otherwise.
+    """
+    symmetries = symmetry.stabilizer(stencildb.stencil_array)
+    while (
+        head_state := _step_head(stencildb, page_counts)
+    ) == orm.StencilHeadStateEnum.headroom and not symmetry.is_canonical_head(
+        stencildb.head, symmetries
+    ):
+        pass
+    return head_state
+
+
+async def _is_redundant(stencildb: orm.StencilDB) -> bool:
+    """Return if a new stencil is covered by its canonical equivalent.
+
+    Parameters
+    ----------
+    stencildb : orm.StencilDB
+        A stencil from the DB.
+
+    Returns
+    -------
+    bool
+        ``True`` if the stencil is new, not canonical and its canonical form is in
+        the stencil collection ``False`` otherwise.
+    """
+    if stencildb.state != orm.StencilStateEnum.new or symmetry.is_canonical_array(
+        stencildb.stencil_array
+    ):
+        return False
+    canonical = " ".join(map(str, symmetry.canonical_array(stencildb.stencil_array)))
+    return (
+        await orm.get_stencil_collection().find_one({"str_rep": canonical}, {"_id": 1})
+        is not None
+    )
+
+
+async def _build_job(
+    stencil: List[int], pages: List[int], job_id: str = None, page_exp: int = None
+) -> str:
     """Build and enqueue a new Montesinos job.
 
     Parameters
@@ -82,13 +438,19 @@ async def _build_job(stencil: List[int], pages: List[int], job_id: str = None) -
         The rational pages to retrieve.
     job_id : str, optional
         The id to use for the job, by default None
+    page_exp : int, optional
+        The page exponent of the stencil, by default ``page-exp``.
 
     Returns
     -------
     str
         The id for the built and enqueued job.
+
+    Raises
+    ------
+    EmptyRationalError
+        A crossing number of the stencil has no unit interval rational tangles.
     """
-    rational_col = rat_orm.get_rational_collection()
     if not job_id:
         job_id = str(uuid.uuid4())
     crossing_num = 0
@@ -102,61 +464,23 @@ async def _build_job(stencil: List[int], pages: List[int], job_id: str = None) -
         rat_lists=list(),
     )
     job.stencil = " ".join(map(str, stencil))
-    for cn, page in zip(stencil, pages):
-        lis = []
-        pipeline = [
-            {
-                "$match": {
-                    "$and": [
-                        {"crossing_num": cn},
-                        {"in_unit_interval": True},
-                        {"isRational": True},
-                    ]
-                }
-            },
-            {
-                "$facet": {
-                    "metadata": [{"$count": "totalCount"}],
-                    "data": [
-                        {
-                            "$skip": int(
-                                page
-                                * math.pow(
-                                    2,
-                                    config_store.cfg_dict["tangle-classes"][
-                                        "montesinos"
-                                    ]["page-exp"],
-                                )
-                            )
-                        },
-                        {
-                            "$limit": int(
-                                math.pow(
-                                    2,
-                                    config_store.cfg_dict["tangle-classes"][
-                                        "montesinos"
-                                    ]["page-exp"],
-                                )
-                            )
-                        },
-                    ],
-                }
-            },
+    mont_cfg = config_store.cfg_dict["tangle-classes"]["montesinos"]
+    if page_exp is None:
+        page_exp = mont_cfg["page-exp"]
+    if mont_cfg.get("job-format", "inline") == "pages":
+        for cn in set(stencil):
+            if await page_index.ensure_ranked(cn) == 0:
+                raise page_index.EmptyRationalError(f"Rational list {cn} is empty.")
+        job.rat_pages = [
+            RationalPageRef(crossing_num=cn, page=page, page_exp=page_exp)
+            for cn, page in zip(stencil, pages)
         ]
-        async for response in rational_col.aggregate(pipeline):
-            if response["metadata"][0]["totalCount"] == 0:
-                raise NameError(
-                    "Rational list is empty."
-                )  # @@@IMPROVEMENT: needs to be updated to exception object
-            lis.extend(
-                [
-                    from_dict(data_class=rat_orm.RationalTangDB, data=rat_tang)._id
-                    for rat_tang in response["data"]
-                ]
+    else:
+        job.rat_lists.extend(
+            await asyncio.gather(
+                *[_get_page(cn, page, page_exp) for cn, page in zip(stencil, pages)]
             )
-            ...
-
-        job.rat_lists.append(lis)
+        )
     await job_queue.enqueue_job(job)
     # @@@IMPROVEMENT: this need error handling.
     return job.job_id
@@ -168,34 +492,154 @@ class MontesinosJobResults(GenerationJobResults):
     mont_list: List[str]
 
 
+class RationalPageRef(BaseModel):
+    """A reference to a page of unit interval rational tangles.
+
+    The page is served by ``/rational/pages/{crossing_num}/{page}``.
+    """
+
+    crossing_num: int
+    page: int
+    page_exp: int
+
+
+async def _write_tangles(tangles_2_store: List[UpdateOne]) -> List[int]:
+    """Write a batch of Montesinos tangle upserts with an unordered bulk write.
+
+    Parameters
+    ----------
+    tangles_2_store : List[UpdateOne]
+        The upserts of the batch.
+
+    Returns
+    -------
+    List[int]
+        The indices of the upserts that were not written.
+    """
+    try:
+        res = await orm.get_montesinos_collection().bulk_write(
+            tangles_2_store, ordered=False
+        )
+        if res.upserted_count:
+            rank_index.invalidate("montesinos")
+        return []
+    except BulkWriteError as e:
+        logger.error(f"Exception while storing montesinos tangles: {e}")
+        failed = [err["index"] for err in e.details["writeErrors"]]
+    except Exception as e:
+        logger.error(f"Exception while storing montesinos tangles: {e}")
+        failed = list(range(len(tangles_2_store)))
+    rank_index.invalidate("montesinos")
+    return failed
+
+
 class MontesinosJob(GenerationJob):
-    """The implementation of job for Montesinos tangles."""
+    """The implementation of job for Montesinos tangles.
 
-    rat_lists: List[List[str]]
+    Jobs carry their rational pages inline in ``rat_lists``, or with the
+    ``pages`` job format only references to them in ``rat_pages``.
+    """
+
+    rat_lists: List[List[str]] = []
+    rat_pages: List[RationalPageRef] = None
     crossing_num: int
     _stencil: str = None
     _results: MontesinosJobResults = None
 
-    async def _update_stencil(self):
-        """Update the parent stencil."""
+    @staticmethod
+    async def _update_stencils(job_ids: List[str]):
+        """Remove finished jobs from their parent stencils.
+
+        The stencils holding the jobs are found through the ``open_jobs.job_id``
+        index, the jobs are pulled from them server side, then those of them
+        without headroom and open jobs are completed, so completions running in
+        parallel do not overwrite each other.
+
+        Parameters
+        ----------
+        job_ids : List[str]
+            The ids of the finished jobs.
+        """
         stencil_col = orm.get_stencil_collection()
-        stencildb = from_dict(
-            data_class=orm.StencilDB,
-            data=(await stencil_col.find_one({"open_jobs.job_id": self.job_id})),
+        await _ensure_stencil_indexes()
+        held = [
+            stencil["_id"]
+            async for stencil in stencil_col.find(
+                {"open_jobs.job_id": {"$in": job_ids}}, {"_id": 1}
+            )
+        ]
+        if not held:
+            return
+        await stencil_col.update_many(
+            {"_id": {"$in": held}},
+            {"$pull": {"open_jobs": {"job_id": {"$in": job_ids}}}},
         )
+        await stencil_col.update_many(
+            {
+                "_id": {"$in": held},
+                "state": orm.StencilStateEnum.no_headroom,
+                "open_jobs": {"$size": 0},
+            },
+            {"$set": {"state": orm.StencilStateEnum.complete}},
+        )
+
+    @classmethod
+    async def store_many(cls, jobs: List["MontesinosJob"]) -> List[bool]:
+        """Store a batch of jobs into the Montesinos tangle collection.
 
-        async def aiter_open_jobs():
-            for job in stencildb.open_jobs:
-                yield job
+        The tangle upserts of all jobs are merged into unordered bulk writes of
+        at most ``job-queue.flush-batch-size`` operations, followed by one
+        write per parent stencil. A job is only stored if all its upserts were
+        written, a failed write marks the jobs owning its tangles and leaves the
+        others stored. Jobs without tangles have nothing to write and are stored.
 
-        i = [j.job_id async for j in aiter_open_jobs()].index(self.job_id)
-        del stencildb.open_jobs[i]
-        if (
-            stencildb.state == orm.StencilStateEnum.no_headroom
-            and len(stencildb.open_jobs) == 0
-        ):
-            stencildb.state = orm.StencilStateEnum.complete
-        await stencil_col.replace_one({"_id": stencildb._id}, asdict(stencildb))
+        Parameters
+        ----------
+        jobs : List[MontesinosJob]
+            The jobs to store.
+
+        Returns
+        -------
+        List[bool]
+            Indicator for success of storage for each job.
+        """
+        batch_size = config_store.cfg_dict["job-queue"].get("flush-batch-size", 10000)
+        stored = [True] * len(jobs)
+        tangles_2_store: Dict[str, UpdateOne] = dict()
+        owners: Dict[str, List[int]] = dict()
+        for idx, job in enumerate(jobs):
+            if not job._results:
+                continue
+            for tang in set(job._results.mont_list):
+                owners.setdefault(str(tang), list()).append(idx)
+                tangles_2_store[str(tang)] = UpdateOne(
+                    {"_id": str(tang)},
+                    {
+                        "$set": {
+                            "crossing_num": int(job.crossing_num),
+                            "parent_stencil": str(job.stencil),
+                            "isMontesinos": True,
+                        }
+                    },
+                    upsert=True,
+                )
+        tangs = list(tangles_2_store)
+        for start in range(0, len(tangs), batch_size):
+            end = start + batch_size
+            failed = await _write_tangles(
+                [tangles_2_store[tang] for tang in tangs[start:end]]
+            )
+            for tang in [tangs[start + idx] for idx in failed]:
+                for idx in owners[tang]:
+                    stored[idx] = False
+        try:
+            await cls._update_stencils(
+                [job.job_id for job, ok in zip(jobs, stored) if ok]
+            )
+        except Exception as e:
+            logger.error(f"Exception while updating montesinos stencils: {e}")
+            stored = [False] * len(jobs)
+        return stored
 
     async def store(self) -> bool:
         """Store the current job into the Montesinos tangle collection.
@@ -205,37 +649,7 @@ class MontesinosJob(GenerationJob):
         bool
             Indicator for success of storage.
         """
-        ret_val = False
-        montesinos_col = orm.get_montesinos_collection()
-
-        async def aiter_results():
-            for tang in list(set(self._results.mont_list)):
-                yield tang
-
-        tangles_2_store = [
-            UpdateOne(
-                {"_id": str(tang)},
-                {
-                    "$set": {
-                        "crossing_num": int(self.crossing_num),
-                        "parent_stencil": str(self.stencil),
-                        "isMontesinos": True,
-                    }
-                },
-                upsert=True,
-            )
-            async for tang in aiter_results()
-        ]
-        if len(tangles_2_store) > 0:
-            ret_val = True
-            try:
-                await montesinos_col.bulk_write(tangles_2_store)
-                await self._update_stencil()
-            except Exception as e:
-                logger.error(f"Exception while storing montesinos tangles: {e}")
-                ret_val = False
-                pass
-        return ret_val
+        return (await MontesinosJob.store_many([self]))[0]
 
     @property
     def stencil(self) -> str:
@@ -253,68 +667,404 @@ class MontesinosJob(GenerationJob):
         self._stencil = value
 
     def update_results(self, res: MontesinosJobResults):
-        """Update the job with the reported results."""
+        """Update the job with the reported results and record its job time."""
         self._results = res
+        _record_job_time(self)
+
+
+async def _build_jobs(
+    jobs: List[Tuple[List[int], List[int], str, int]], skip_enqueued: bool = False
+) -> List[str | BaseException]:
+    """Build and enqueue jobs concurrently.
+
+    At most ``tangle-classes.montesinos.build-concurrency`` (default 16) jobs are
+    built at a time, each job is enqueued as soon as it is built.
+
+    Parameters
+    ----------
+    jobs : List[Tuple[List[int], List[int], str, int]]
+        The stencil, rational pages, job id and page exponent of each job.
+    skip_enqueued : bool, optional
+        Skip jobs already in the job queue, by default False.
+
+    Returns
+    -------
+    List[str | BaseException]
+        For each job its id, or the exception raised while building it.
+    """
+    limit = asyncio.Semaphore(
+        config_store.cfg_dict["tangle-classes"]["montesinos"].get(
+            "build-concurrency", 16
+        )
+    )
+
+    async def build(
+        stencil: List[int], pages: List[int], job_id: str, page_exp: int
+    ) -> str:
+        async with limit:
+            if skip_enqueued and await job_queue.is_enqueued(job_id):
+                return job_id
+            return await _build_job(stencil, pages, job_id=job_id, page_exp=page_exp)
+
+    return await asyncio.gather(*[build(*job) for job in jobs], return_exceptions=True)
 
 
 async def get_jobs(count: int = 1):
     """Get and build a specified number of jobs.
 
+    Concurrent calls are coalesced into a single in-flight refill. Callers pass
+    the shortfall of new jobs they saw, so the shortfalls of concurrent callers
+    overlap. A caller that joins a running pass waits for that pass to finish. The
+    first caller then runs a follow-up pass only for the largest joined shortfall
+    the finished pass did not build.
+
     Parameters
     ----------
     count : int, optional
         The number of jobs to get and build, by default 1
     """
+    global _refill, _refill_demand
+    if count <= 0:
+        return
+    if _refill is not None:
+        _refill_demand = max(_refill_demand, count)
+        await asyncio.shield(_refill)
+        return
+    while count > 0:
+        _refill = asyncio.get_running_loop().create_future()
+        built = 0
+        try:
+            built = await _get_jobs(count)
+        finally:
+            refill, _refill = _refill, None
+            pending, _refill_demand = _refill_demand, 0
+            refill.set_result(None)
+        count = pending - built
+
+
+async def _plan_stencil(stencil: orm.StencilDB, count: int) -> List[dict]:
+    """Walk the head of a stencil to plan its next jobs.
+
+    The stencil is started, a new stencil is given its page exponent, and its head
+    is moved past the pages of the planned jobs.
+
+    Parameters
+    ----------
+    stencil : orm.StencilDB
+        The stencil to plan, updated in place.
+    count : int
+        The most jobs to plan.
+
+    Returns
+    -------
+    List[dict]
+        The open jobs, each with a job id and the cursor of its pages.
+    """
+    if stencil.state == orm.StencilStateEnum.new:
+        stencil.page_exp = _choose_page_exp(stencil.stencil_array)
+    stencil.state = orm.StencilStateEnum.started
+    page_counts = [
+        await page_index.page_count(cn, _stencil_page_exp(stencil))
+        for cn in stencil.stencil_array
+    ]
+    opened = []
+    while len(opened) < count:
+        opened.append(
+            {
+                "job_id": str(uuid.uuid4()),
+                "cursor": copy.deepcopy(stencil.head),
+            }
+        )
+        head_state = _move_head(stencil, page_counts)
+        if head_state == orm.StencilHeadStateEnum.no_headroom:
+            stencil.state = orm.StencilStateEnum.no_headroom
+            break
+    return opened
+
+
+async def _claim_stencil(
+    stencildb: dict, count: int
+) -> Optional[Tuple[orm.StencilDB, dict, List[dict]]]:
+    """Plan the next jobs of an open stencil and claim them.
+
+    The claim is an update conditional on the head and state the stencil was read
+    with. If another process moved the stencil first the claim matches nothing and
+    the stencil is planned again from its new head. A stencil started before
+    rational pages were ranked is reset with ``reset_stencils`` and planned anew.
+
+    Parameters
+    ----------
+    stencildb : dict
+        The stencil document as read.
+    count : int
+        The most jobs to plan.
+
+    Returns
+    -------
+    Optional[Tuple[orm.StencilDB, dict, List[dict]]]
+        The claimed stencil, the head, state and page exponent it was read with and
+        its open jobs, ``None`` if the stencil is no longer open.
+    """
     stencil_col = orm.get_stencil_collection()
-    try:
-        stencildb = await stencil_col.find_one(OPEN_STEN_FILTER)
-        if stencildb:
-            stencil = from_dict(
-                data_class=orm.StencilDB,
-                data=stencildb,
+    while stencildb:
+        stencil = from_dict(data_class=orm.StencilDB, data=stencildb)
+        if stencil.state != orm.StencilStateEnum.new and stencil.page_exp is None:
+            # Planned against the unranked page order, plan it again from the start.
+            await reset_stencils({"$and": [UNRANKED_STEN_FILTER, {"_id": stencil._id}]})
+        else:
+            read = {
+                "head": copy.deepcopy(stencil.head),
+                "state": stencil.state,
+                "page_exp": stencil.page_exp,
+            }
+            opened = await _plan_stencil(stencil, count)
+            res = await stencil_col.update_one(
+                {"_id": stencil._id, "head": read["head"], "state": read["state"]},
+                {
+                    "$set": {
+                        "head": stencil.head,
+                        "state": stencil.state,
+                        "page_exp": stencil.page_exp,
+                    },
+                    "$push": {"open_jobs": {"$each": opened}},
+                },
+            )
+            if res.matched_count:
+                return stencil, read, opened
+        # Another process moved the stencil, plan it from its new head.
+        stencildb = await stencil_col.find_one(
+            {"$and": [OPEN_STEN_FILTER, {"_id": stencil._id}]}
+        )
+    return None
+
+
+async def _release_stencil(stencil: orm.StencilDB, read: dict, opened: List[dict]):
+    """Release a claimed stencil none of whose jobs could be built.
+
+    The stencil is put back to the head, state and page exponent it was read with
+    and its open jobs are removed, unless another process moved it since. A page
+    exponent it was read without is unset again.
+
+    Parameters
+    ----------
+    stencil : orm.StencilDB
+        The claimed stencil.
+    read : dict
+        The head, state and page exponent the stencil was read with.
+    opened : List[dict]
+        The open jobs of the claim.
+    """
+    release = {
+        "$set": {key: value for key, value in read.items() if value is not None},
+        "$pull": {"open_jobs": {"job_id": {"$in": [job["job_id"] for job in opened]}}},
+    }
+    if read["page_exp"] is None:
+        release["$unset"] = {"page_exp": ""}
+    await orm.get_stencil_collection().update_one(
+        {"_id": stencil._id, "head": stencil.head}, release
+    )
+
+
+async def _claim_stencils(count: int) -> List[Tuple[orm.StencilDB, dict, List[dict]]]:
+    """Claim the next jobs of the open stencils.
+
+    Open stencils are claimed in turn with ``_claim_stencil`` until ``count`` jobs
+    are planned or none is left. Redundant stencils are marked complete instead.
+
+    Parameters
+    ----------
+    count : int
+        The number of jobs to claim.
+
+    Returns
+    -------
+    List[Tuple[orm.StencilDB, dict, List[dict]]]
+        The claims of ``_claim_stencil``.
+    """
+    stencil_col = orm.get_stencil_collection()
+    claims: List[Tuple[orm.StencilDB, dict, List[dict]]] = []
+    skipped: List[ObjectId] = []
+    stencildb = await stencil_col.find_one(OPEN_STEN_FILTER)
+    while stencildb:
+        stencil = from_dict(data_class=orm.StencilDB, data=stencildb)
+        if await _is_redundant(stencil):
+            await stencil_col.update_one(
+                {"_id": stencil._id},
+                {"$set": {"state": orm.StencilStateEnum.complete}},
             )
-            stencil.state = orm.StencilStateEnum.started
-            while count > 0 and stencil:
-                job_id = await _build_job(stencil.stencil_array, stencil.head)
-                stencil.open_jobs.append(
-                    {"job_id": job_id, "cursor": copy.deepcopy(stencil.head)}
+            skipped.append(stencil._id)
+        elif claim := await _claim_stencil(stencildb, count):
+            claims.append(claim)
+            count -= len(claim[2])
+            if claim[0].state != orm.StencilStateEnum.no_headroom:
+                break
+        planned = [stencil._id for stencil, _, _ in claims] + skipped
+        stencildb = await stencil_col.find_one(
+            {"$and": [OPEN_STEN_FILTER, {"_id": {"$nin": planned}}]}
+        )
+    return claims
+
+
+async def _get_jobs(count: int):
+    """Build a specified number of jobs from the open stencils.
+
+    The jobs are planned on the open stencils with ``_claim_stencils``, so
+    concurrent producers never plan the same pages. The claimed jobs are then built
+    concurrently with ``_build_jobs``. A stencil none of whose jobs could be built
+    is released again, jobs that fail next to built ones stay open and are rebuilt
+    by ``startup_task``.
+
+    Parameters
+    ----------
+    count : int
+        The number of jobs to get and build.
+
+    Returns
+    -------
+    int
+        The number of jobs built.
+    """
+    built_count = 0
+    try:
+        claims = await _claim_stencils(count)
+        plan = [
+            (stencil, open_job) for stencil, _, opened in claims for open_job in opened
+        ]
+        built = await _build_jobs(
+            [
+                (
+                    stencil.stencil_array,
+                    open_job["cursor"],
+                    open_job["job_id"],
+                    _stencil_page_exp(stencil),
                 )
-                count -= 1
-                if _move_head(stencil) == orm.StencilHeadStateEnum.no_headroom:
-                    stencil.state = orm.StencilStateEnum.no_headroom
-                    await stencil_col.replace_one({"_id": stencil._id}, asdict(stencil))
-                    if stencildb := await stencil_col.find_one(OPEN_STEN_FILTER):
-                        stencil = from_dict(
-                            data_class=orm.StencilDB,
-                            data=stencildb,
-                        )
-                        stencil.state = orm.StencilStateEnum.started
-                    else:
-                        break
-            await stencil_col.replace_one({"_id": stencil._id}, asdict(stencil))
+                for stencil, open_job in plan
+            ]
+        )
+        failed: Dict[ObjectId, int] = dict()
+        for (stencil, open_job), res in zip(plan, built):
+            if isinstance(res, Exception):
+                failed[stencil._id] = failed.get(stencil._id, 0) + 1
+                logger.error(f"Exception while obtaining jobs: {res}")
+            else:
+                built_count += 1
+        for stencil, read, opened in claims:
+            if opened and failed.get(stencil._id, 0) == len(opened):
+                await _release_stencil(stencil, read, opened)
     except Exception as e:
         logger.error(f"Exception while obtaining jobs: {e}")
-        ...
+    return built_count
+
+
+async def reset_stencils(stencil_filter: dict) -> int:
+    """Put started stencils back in the new state.
+
+    The heads and open job cursors of a stencil are only valid for the page order
+    of the rational tangles they were planned against. Reset stencils are planned
+    again from their first page, Montesinos tangles are stored with upserts so
+    pages built again are not duplicated. Each reset is conditional on the filter
+    so a stencil claimed in the meantime is left alone.
+
+    Parameters
+    ----------
+    stencil_filter : dict
+        The filter selecting the stencils to reset.
+
+    Returns
+    -------
+    int
+        The number of reset stencils.
+    """
+    stencil_col = orm.get_stencil_collection()
+    resets = [
+        UpdateOne(
+            {"$and": [stencil_filter, {"_id": stencil["_id"]}]},
+            {
+                "$set": {
+                    "head": [0] * len(stencil["stencil_array"]),
+                    "state": orm.StencilStateEnum.new,
+                    "open_jobs": [],
+                },
+                "$unset": {"page_exp": ""},
+            },
+        )
+        async for stencil in stencil_col.find(stencil_filter, {"stencil_array": 1})
+    ]
+    batch_size = config_store.cfg_dict["job-queue"].get("flush-batch-size", 10000)
+    reset = 0
+    for start in range(0, len(resets), batch_size):
+        end = start + batch_size
+        res = await stencil_col.bulk_write(resets[start:end], ordered=False)
+        reset += res.modified_count
+    return reset
 
 
 async def startup_task():
-    """Task to run at startup to initialize Montesinos jobs."""
+    """Task to run at startup to initialize Montesinos jobs.
+
+    Stencils started before rational pages were ranked are reset first, their
+    cursors point at pages of the old order. The open jobs of all started stencils
+    are then collected in one pass over the stencils and rebuilt concurrently,
+    each job is served as soon as it is enqueued.
+    """
     stencil_col = orm.get_stencil_collection()
+    reset = await reset_stencils(UNRANKED_STEN_FILTER)
+    if reset:
+        logger.info(f"Reset {reset} stencils started before pages were ranked.")
 
+    recover = []
     async for stencildb in stencil_col.find(STARTED_STEN_FILTER):
         stencildb = from_dict(data_class=orm.StencilDB, data=stencildb)
-
-        async def aiter_open_jobs():
-            for open_item in stencildb.open_jobs:
-                yield open_item
-
-        async for open_item in aiter_open_jobs():
-            await _build_job(
-                stencildb.stencil_array, open_item.cursor, job_id=open_item.job_id
+        recover.extend(
+            (
+                stencildb.stencil_array,
+                open_item.cursor,
+                open_item.job_id,
+                _stencil_page_exp(stencildb),
             )
-            ...
+            for open_item in stencildb.open_jobs
+        )
+    for res in await _build_jobs(recover, skip_enqueued=True):
+        if isinstance(res, Exception):
+            logger.error(f"Exception while recovering jobs: {res}")
     new_mont_j_cnt = (await job_queue.get_job_statistics(MontesinosJob))["new"]
     if new_mont_j_cnt < config_store.cfg_dict["job-queue"]["min-new-count"]:
         await get_jobs(
             config_store.cfg_dict["job-queue"]["min-new-count"] - new_mont_j_cnt
         )
+
+
+def _watermarks() -> tuple[int, int]:
+    """Return the low and high watermarks for new Montesinos jobs.
+
+    Returns
+    -------
+    tuple[int, int]
+        ``job-queue.min-new-count`` and ``job-queue.max-new-count``, the high
+        watermark defaults to twice the low watermark.
+    """
+    jq_cfg = config_store.cfg_dict["job-queue"]
+    low = jq_cfg["min-new-count"]
+    return low, max(low, jq_cfg.get("max-new-count", 2 * low))
+
+
+async def task_fill_job_queue():
+    """Task that keeps the new Montesinos jobs between the watermarks.
+
+    The task wakes whenever a job is leased, or after ``job-queue.clocks.fill``
+    seconds, and refills the queue up to the high watermark once the new job
+    count drops below the low watermark.
+    """
+    while True:
+        job_queue.lease_event.clear()
+        low, high = _watermarks()
+        new_mont_j_cnt = (await job_queue.get_job_statistics(MontesinosJob))["new"]
+        if new_mont_j_cnt < low:
+            await get_jobs(high - new_mont_j_cnt)
+        try:
+            await asyncio.wait_for(
+                job_queue.lease_event.wait(),
+                config_store.cfg_dict["job-queue"]["clocks"].get("fill", 60),
+            )
+        except asyncio.TimeoutError:
+            pass
@@ -66,6 +66,7 @@ class StencilDB:
     head: List[int]
     state: int
     open_jobs: List[StencilJobDB]
+    page_exp: int = None
 
 
 @dataclass
@@ -1,10 +1,13 @@
 """Defines the public API endpoints to work/report on montesinos tangles."""
 
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
 from . import orm, job
 from ..internal import job_queue
+from ..internal import cursor as keyset
+from ..internal import fast_json
+from ..internal import rank_index
+from ..internal import export
 from typing import Annotated, List
-from dacite import from_dict
 
 router = APIRouter(
     prefix="/montesinos",
@@ -13,6 +16,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+rank_index.register("montesinos", orm.get_montesinos_collection, {"isMontesinos": True})
+
 
 ################################################################################
 # Helper Functions
@@ -20,18 +25,40 @@ router = APIRouter(
 
 
 async def _retrieve_montesinos_tangles(
+    response: Response,
     start_id: str = None,
     crossing_num_min: int = 0,
     page_idx: int = 0,
     page_size: int = 100,
+    cursor: str = None,
 ):
     if page_size <= 0:
         raise HTTPException(status_code=404, detail="Page size must be positive")
     tangle_col = orm.get_montesinos_collection()
-    if start_id is None:
+    fields = fast_json.projection(orm.MontesinosTangleDB)
+    start = rank_index.start_rank("montesinos", crossing_num_min)
+    if cursor is not None:
+        try:
+            after = keyset.decode_cursor("montesinos", cursor)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Invalid cursor")
+        tangle_page = (
+            await tangle_col.find(
+                {"isMontesinos": True} | keyset.keyset_filter(*after), fields
+            )
+            .sort([("crossing_num", 1), ("_id", 1)])
+            .limit(page_size)
+            .to_list(page_size)
+        )
+    elif start_id is None and start is not None:
+        tangle_page = await rank_index.get_page(
+            "montesinos", start + page_idx * page_size, page_size, fields
+        )
+    elif start_id is None:
         tangle_page = (
             await tangle_col.find(
-                {"crossing_num": {"$gte": crossing_num_min}, "isMontesinos": True}
+                {"crossing_num": {"$gte": crossing_num_min}, "isMontesinos": True},
+                fields,
             )
             .sort([("crossing_num", 1), ("_id", 1)])
             .limit(page_size)
@@ -49,7 +76,8 @@ async def _retrieve_montesinos_tangles(
                                 "_id": {"$gt": tangle_page[-1]["_id"]},
                             },
                         ],
-                    }
+                    },
+                    fields,
                 )
                 .sort([("crossing_num", 1), ("_id", 1)])
                 .limit(page_size)
@@ -67,22 +95,21 @@ async def _retrieve_montesinos_tangles(
                             "_id": {"$gt": start_id},
                         },
                     ],
-                }
+                },
+                fields,
             )
             .sort([("crossing_num", 1), ("_id", 1)])
             .limit(page_size)
             .to_list(page_size)
         )
-    return [
-        from_dict(data_class=orm.MontesinosTangleDB, data=tang) for tang in tangle_page
-    ]
+    keyset.set_next_cursor(response, "montesinos", tangle_page, page_size)
+    return tangle_page
 
 
 @router.get("/tangles", response_model=List[orm.MontesinosTangleDB])
 async def retrieve_montesinos_tangles(
-    tangle_list: Annotated[
-        List[orm.MontesinosTangleDB], Depends(_retrieve_montesinos_tangles)
-    ]
+    tangle_list: Annotated[List[dict], Depends(_retrieve_montesinos_tangles)],
+    response: Response,
 ):
     """Return the next montesinos job.
 
@@ -96,13 +123,18 @@ async def retrieve_montesinos_tangles(
     montesinos_Job
         The next montesinos Job.
     """
-    return tangle_list
+    return fast_json.tangle_response(tangle_list, orm.MontesinosTangleDB, response)
 
 
 @router.get("/queue/stats")
-async def retrieve_generic_job_queue_stats() -> dict:
+async def retrieve_generic_job_queue_stats(by_client: bool = False) -> dict:
     """Return job queue statistics for generic jobs.
 
+    Parameters
+    ----------
+    by_client : bool, optional
+        Include a per client breakdown of the statistics, by default False.
+
     Returns
     -------
     dict
@@ -111,5 +143,80 @@ async def retrieve_generic_job_queue_stats() -> dict:
         - New
         - Pending
         - Complete
+        - Clients (if requested)
+    """
+    return await job_queue.get_job_statistics(job.MontesinosJob, by_client)
+
+
+@router.get("/page_cache/stats")
+async def retrieve_page_cache_stats() -> dict:
+    """Return the statistics of the rational page cache used to build jobs.
+
+    Returns
+    -------
+    dict
+        Rational page cache statistics. Broken into:
+        - Hits
+        - Misses
+        - Pages
+        - Interned
+        - Bytes
+        - Max bytes
+    """
+    return job.get_page_cache().statistics()
+
+
+@router.get("/tangle_counts")
+async def retrieve_tangle_counts() -> dict:
+    """Return the number of Montesinos tangles at each crossing number.
+
+    The counts are known once the class is ranked, with them downloaders can split
+    a crossing number into independent ``page_idx`` ranges.
+
+    Returns
+    -------
+    dict
+        The tangle counts keyed by crossing number.
+    """
+    counts = rank_index.counts("montesinos")
+    if counts is None:
+        raise HTTPException(status_code=404, detail="Tangles are not ranked")
+    return counts
+
+
+@router.get("/export")
+async def export_montesinos_tangles(
+    fmt: Annotated[
+        export.ExportFormatEnum, Query(alias="format")
+    ] = export.ExportFormatEnum.ndjson,
+    crossing_num_min: int = 0,
+    crossing_num_max: int = None,
+    start_id: str = None,
+):
+    """Stream every Montesinos tangle in a crossing number range.
+
+    Parameters
+    ----------
+    fmt : export.ExportFormatEnum, optional
+        Export as NDJSON, CSV, Arrow IPC stream or Parquet, by default NDJSON.
+    crossing_num_min : int, optional
+        The lowest crossing number to export, by default 0.
+    crossing_num_max : int, optional
+        The highest crossing number to export, by default no bound.
+    start_id : str, optional
+        The last ``_id`` received from an interrupted export to resume after.
+
+    Returns
+    -------
+    StreamingResponse
+        The tangles in ``(crossing_num, _id)`` order.
     """
-    return await job_queue.get_job_statistics(job.MontesinosJob)
+    return await export.export_tangles(
+        orm.get_montesinos_collection(),
+        {"isMontesinos": True},
+        orm.MontesinosTangleDB,
+        fmt,
+        crossing_num_min,
+        crossing_num_max,
+        start_id,
+    )
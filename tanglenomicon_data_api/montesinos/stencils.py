@@ -0,0 +1,189 @@
+"""Generates the Montesinos stencils of a range of crossing numbers."""
+
+from ..internal import config_store
+from . import orm, symmetry
+from .job import OPEN_STEN_FILTER, STARTED_STEN_FILTER, reset_stencils
+from typing import Iterator, List
+from itertools import islice
+from pymongo.errors import BulkWriteError
+import asyncio
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+MIN_ENTRY = 2
+MIN_LENGTH = 2
+_INSERT_SIZE = 10000
+
+
+def stencil_arrays(crossing_num: int) -> Iterator[List[int]]:
+    """Enumerate the stencil arrays of a crossing number.
+
+    A stencil array is an ordered list of at least ``MIN_LENGTH`` rational
+    crossing numbers, each at least ``MIN_ENTRY``, summing to the crossing number.
+    Only the canonical array of each rotation and reversal class is enumerated.
+
+    Parameters
+    ----------
+    crossing_num : int
+        The crossing number of the stencils.
+
+    Yields
+    ------
+    Iterator[List[int]]
+        The stencil arrays.
+    """
+
+    def compositions(remaining: int) -> Iterator[List[int]]:
+        if remaining == 0:
+            yield []
+        for entry in range(MIN_ENTRY, remaining + 1):
+            for rest in compositions(remaining - entry):
+                yield [entry] + rest
+
+    for stencil_array in compositions(crossing_num):
+        if len(stencil_array) >= MIN_LENGTH and symmetry.is_canonical_array(
+            stencil_array
+        ):
+            yield stencil_array
+
+
+def _new_stencil(stencil_array: List[int]) -> dict:
+    """Return the document of a new stencil.
+
+    Parameters
+    ----------
+    stencil_array : List[int]
+        The stencil array.
+
+    Returns
+    -------
+    dict
+        The stencil document in the new state.
+    """
+    return {
+        "stencil_array": stencil_array,
+        "str_rep": " ".join(map(str, stencil_array)),
+        "crossing_num": sum(stencil_array),
+        "head": [0] * len(stencil_array),
+        "state": orm.StencilStateEnum.new,
+        "open_jobs": [],
+    }
+
+
+def _next_stencils(stencil_arrays: Iterator[List[int]]) -> List[dict]:
+    """Return the documents of the next chunk of stencil arrays.
+
+    Parameters
+    ----------
+    stencil_arrays : Iterator[List[int]]
+        The remaining stencil arrays.
+
+    Returns
+    -------
+    List[dict]
+        At most ``_INSERT_SIZE`` new stencil documents, none when the arrays are
+        exhausted.
+    """
+    return [_new_stencil(s) for s in islice(stencil_arrays, _INSERT_SIZE)]
+
+
+async def _insert_stencils(stencils: List[dict]) -> int:
+    """Insert stencils with an unordered bulk insert.
+
+    Parameters
+    ----------
+    stencils : List[dict]
+        The stencil documents.
+
+    Returns
+    -------
+    int
+        The number of inserted stencils.
+    """
+    try:
+        res = await orm.get_stencil_collection().insert_many(stencils, ordered=False)
+        return len(res.inserted_ids)
+    except BulkWriteError as e:
+        logger.error(f"Exception while inserting stencils: {e}")
+        return e.details["nInserted"]
+
+
+async def generate_stencils(crossing_num_min: int, crossing_num_max: int) -> int:
+    """Insert the missing stencils of a range of crossing numbers.
+
+    Stencils already in the stencil collection are skipped, also when stored as
+    another array of their rotation and reversal class. The others are
+    inserted with unordered bulk inserts. The arrays are enumerated in chunks in a
+    worker thread so the event loop keeps serving requests meanwhile.
+
+    Parameters
+    ----------
+    crossing_num_min : int
+        The lowest crossing number to generate.
+    crossing_num_max : int
+        The highest crossing number to generate.
+
+    Returns
+    -------
+    int
+        The number of inserted stencils.
+    """
+    stencil_col = orm.get_stencil_collection()
+    inserted = 0
+    for crossing_num in range(crossing_num_min, crossing_num_max + 1):
+        existing = {
+            " ".join(map(str, symmetry.canonical_array(stencil["stencil_array"])))
+            async for stencil in stencil_col.find(
+                {"crossing_num": crossing_num}, {"stencil_array": 1}
+            )
+        }
+        missing = (
+            stencil_array
+            for stencil_array in stencil_arrays(crossing_num)
+            if " ".join(map(str, stencil_array)) not in existing
+        )
+        while stencils := await asyncio.to_thread(_next_stencils, missing):
+            inserted += await _insert_stencils(stencils)
+    return inserted
+
+
+async def reset_started_stencils() -> int:
+    """Put every started stencil back in the new state.
+
+    Stencils started before rational pages were ranked are reset automatically
+    by the Montesinos job unit, this resets all of them, for example after the
+    rational tangles were rewritten.
+
+    Returns
+    -------
+    int
+        The number of reset stencils.
+    """
+    return await reset_stencils(STARTED_STEN_FILTER)
+
+
+async def task_generate_stencils():
+    """Task that generates the stencils of the next crossing number.
+
+    Whenever no open stencil is left the stencils of the crossing number after
+    the highest one in the collection are generated, up to
+    ``tangle-classes.montesinos.max-crossing-num``. The task checks every
+    ``job-queue.clocks.stencil`` seconds and does nothing if no maximum is set.
+    """
+    while True:
+        max_cn = config_store.cfg_dict["tangle-classes"]["montesinos"].get(
+            "max-crossing-num"
+        )
+        stencil_col = orm.get_stencil_collection()
+        if max_cn is not None and not await stencil_col.find_one(OPEN_STEN_FILTER):
+            last = await stencil_col.find_one(
+                {}, {"crossing_num": 1}, sort=[("crossing_num", -1)]
+            )
+            next_cn = last["crossing_num"] + 1 if last else 2 * MIN_ENTRY
+            if next_cn <= max_cn:
+                inserted = await generate_stencils(next_cn, next_cn)
+                logger.info(f"Generated {inserted} stencils of crossing num {next_cn}.")
+        await asyncio.sleep(
+            config_store.cfg_dict["job-queue"]["clocks"].get("stencil", 300)
+        )
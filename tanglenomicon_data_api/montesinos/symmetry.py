@@ -0,0 +1,121 @@
+"""Symmetries of Montesinos stencils.
+
+Montesinos tangles are equivalent up to cyclic rotation and reversal of their
+rational parts, the dihedral group acting on the positions of a stencil.
+"""
+
+from typing import List, Tuple
+
+Permutation = Tuple[int, ...]
+
+
+def dihedral(length: int) -> List[Permutation]:
+    """Return the rotations and reflections of ``length`` positions.
+
+    Parameters
+    ----------
+    length : int
+        The number of positions.
+
+    Returns
+    -------
+    List[Permutation]
+        The permutations, position ``i`` is sent to ``perm[i]``.
+    """
+    rotations = [tuple((i + s) % length for i in range(length)) for s in range(length)]
+    reflections = [
+        tuple((s - i) % length for i in range(length)) for s in range(length)
+    ]
+    return rotations + reflections
+
+
+def permute(seq: List[int], perm: Permutation) -> List[int]:
+    """Return a sequence with its positions permuted.
+
+    Parameters
+    ----------
+    seq : List[int]
+        The sequence.
+    perm : Permutation
+        The permutation.
+
+    Returns
+    -------
+    List[int]
+        The permuted sequence.
+    """
+    return [seq[p] for p in perm]
+
+
+def canonical_array(stencil_array: List[int]) -> List[int]:
+    """Return the canonical representative of a stencil array.
+
+    Parameters
+    ----------
+    stencil_array : List[int]
+        The stencil array.
+
+    Returns
+    -------
+    List[int]
+        The lexicographically smallest rotation or reversal of the array.
+    """
+    return min(permute(stencil_array, p) for p in dihedral(len(stencil_array)))
+
+
+def is_canonical_array(stencil_array: List[int]) -> bool:
+    """Return if a stencil array is its canonical representative.
+
+    Parameters
+    ----------
+    stencil_array : List[int]
+        The stencil array.
+
+    Returns
+    -------
+    bool
+        ``True`` if the array is canonical ``False`` otherwise.
+    """
+    return canonical_array(stencil_array) == list(stencil_array)
+
+
+def stabilizer(stencil_array: List[int]) -> List[Permutation]:
+    """Return the symmetries that leave a stencil array unchanged.
+
+    Parameters
+    ----------
+    stencil_array : List[int]
+        The stencil array.
+
+    Returns
+    -------
+    List[Permutation]
+        The rotations and reflections fixing the array, always including the
+        identity.
+    """
+    return [
+        p
+        for p in dihedral(len(stencil_array))
+        if permute(stencil_array, p) == list(stencil_array)
+    ]
+
+
+def is_canonical_head(head: List[int], symmetries: List[Permutation]) -> bool:
+    """Return if a head is the canonical page ordering under the symmetries.
+
+    Heads related by a symmetry of their stencil array enumerate equivalent
+    tangles, only the lexicographically smallest of them is canonical.
+
+    Parameters
+    ----------
+    head : List[int]
+        The pages of the head.
+    symmetries : List[Permutation]
+        The stabilizer of the stencil array.
+
+    Returns
+    -------
+    bool
+        ``True`` if the head is canonical ``False`` otherwise.
+    """
+    return all(list(head) <= permute(head, p) for p in symmetries)
@@ -0,0 +1,199 @@
+"""Page index over the unit interval rational tangles of each crossing number.
+
+Every rational tangle in the unit interval is given a ``unit_rank``, its position
+among the unit interval tangles of the same crossing number ordered by ``_id``.
+With a ``(crossing_num, unit_rank)`` index a page is a single range read and the
+size of a crossing number is known once it is ranked. The sizes are loaded at
+startup and kept until ``invalidate`` is called by a writer of rational tangles.
+"""
+
+from typing import Dict, List
+from pymongo import ASCENDING, UpdateOne
+from . import orm
+import asyncio
+
+RANK_FIELD = "unit_rank"
+UNIT_FILTER = {"in_unit_interval": True, "isRational": True}
+_BULK_SIZE = 10000
+
+
+class EmptyRationalError(LookupError):
+    """A crossing number has no unit interval rational tangles."""
+
+
+_ranked: Dict[int, int] = dict()
+_rank_locks: Dict[int, asyncio.Lock] = dict()
+_index_lock: asyncio.Lock = asyncio.Lock()
+_indexed = False
+generation: int = 0
+
+
+async def _rank(crossing_num: int) -> int:
+    """Write the unit rank of every unit interval tangle of a crossing number.
+
+    The tangles are read in ``_id`` order with their current rank and the ranks
+    that changed are written in bulks of ``_BULK_SIZE`` while the cursor is read,
+    so the memory used does not grow with the crossing number.
+
+    Parameters
+    ----------
+    crossing_num : int
+        The crossing number to rank.
+
+    Returns
+    -------
+    int
+        The number of ranked tangles.
+    """
+    rational_col = orm.get_rational_collection()
+    ranks = []
+    rank = 0
+    async for rat_tang in (
+        rational_col.find(
+            {"crossing_num": crossing_num} | UNIT_FILTER, {"_id": 1, RANK_FIELD: 1}
+        )
+        .sort("_id", ASCENDING)
+        .batch_size(_BULK_SIZE)
+    ):
+        if rat_tang.get(RANK_FIELD) != rank:
+            ranks.append(
+                UpdateOne({"_id": rat_tang["_id"]}, {"$set": {RANK_FIELD: rank}})
+            )
+        if len(ranks) == _BULK_SIZE:
+            await rational_col.bulk_write(ranks, ordered=False)
+            ranks = []
+        rank += 1
+    if ranks:
+        await rational_col.bulk_write(ranks, ordered=False)
+    return rank
+
+
+async def ensure_ranked(crossing_num: int) -> int:
+    """Rank a crossing number if any of its unit interval tangles is unranked.
+
+    Parameters
+    ----------
+    crossing_num : int
+        The crossing number to rank.
+
+    Returns
+    -------
+    int
+        The number of unit interval tangles of the crossing number.
+    """
+    global _indexed
+    if crossing_num in _ranked:
+        return _ranked[crossing_num]
+    rational_col = orm.get_rational_collection()
+    async with _index_lock:
+        if not _indexed:
+            await rational_col.create_index(
+                [("crossing_num", ASCENDING), (RANK_FIELD, ASCENDING)]
+            )
+            _indexed = True
+    # Crossing numbers are ranked under their own lock, ranking one does not
+    # hold up the page reads of the others.
+    async with _rank_locks.setdefault(crossing_num, asyncio.Lock()):
+        if crossing_num not in _ranked:
+            rank_filter = {"crossing_num": crossing_num} | UNIT_FILTER
+            if await rational_col.find_one(
+                rank_filter | {RANK_FIELD: {"$exists": False}}, {"_id": 1}
+            ):
+                _ranked[crossing_num] = await _rank(crossing_num)
+            else:
+                _ranked[crossing_num] = await rational_col.count_documents(
+                    rank_filter
+                )
+    return _ranked[crossing_num]
+
+
+def invalidate(crossing_num: int = None):
+    """Forget the ranking of a crossing number, or of all crossing numbers.
+
+    Call this after rational tangles are written so they are ranked again.
+    Forgetting all crossing numbers also resets the index state, as done when
+    the database connection changes. Every call bumps ``generation`` so caches of
+    pages know to drop them.
+
+    Parameters
+    ----------
+    crossing_num : int, optional
+        The crossing number to forget, by default all.
+    """
+    global _indexed, _index_lock, generation
+    generation += 1
+    if crossing_num is None:
+        _ranked.clear()
+        _rank_locks.clear()
+        _indexed = False
+        _index_lock = asyncio.Lock()
+    else:
+        _ranked.pop(crossing_num, None)
+
+
+async def startup_task():
+    """Task to run at startup to load the counts of every crossing number.
+
+    Crossing numbers with unranked tangles are ranked on the way.
+    """
+    rational_col = orm.get_rational_collection()
+    crossing_nums = await rational_col.distinct("crossing_num", UNIT_FILTER)
+    for crossing_num in sorted(crossing_nums):
+        await ensure_ranked(crossing_num)
+
+
+async def page_count(crossing_num: int, page_exp: int) -> int:
+    """Return the number of pages of a crossing number.
+
+    Parameters
+    ----------
+    crossing_num : int
+        The crossing number of the tangles.
+    page_exp : int
+        The pages hold ``2**page_exp`` tangles.
+
+    Returns
+    -------
+    int
+        The number of pages, at least one.
+    """
+    size = 2**page_exp
+    return max(1, (await ensure_ranked(crossing_num) + size - 1) // size)
+
+
+async def get_page(crossing_num: int, page: int, page_exp: int) -> List[str]:
+    """Return the ids of a page of unit interval rational tangles.
+
+    Parameters
+    ----------
+    crossing_num : int
+        The crossing number of the tangles.
+    page : int
+        The page to read.
+    page_exp : int
+        The page holds ``2**page_exp`` tangles.
+
+    Returns
+    -------
+    List[str]
+        The tangle ids of the page in rank order.
+
+    Raises
+    ------
+    EmptyRationalError
+        The crossing number has no unit interval tangles.
+    """
+    if await ensure_ranked(crossing_num) == 0:
+        raise EmptyRationalError(f"Rational list {crossing_num} is empty.")
+    size = 2**page_exp
+    rational_col = orm.get_rational_collection()
+    return [
+        rat_tang["_id"]
+        async for rat_tang in rational_col.find(
+            {
+                "crossing_num": crossing_num,
+                RANK_FIELD: {"$gte": page * size, "$lt": (page + 1) * size},
+            },
+            {"_id": 1},
+        ).sort(RANK_FIELD, ASCENDING)
+    ]
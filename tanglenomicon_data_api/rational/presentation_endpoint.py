@@ -1,9 +1,14 @@
 """Defines the public API endpoints to work/report on rational tangles."""
 
-from fastapi import Depends, APIRouter, HTTPException
-from . import orm
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response
+from . import orm, page_index
+from ..internal import config_store
+from ..internal import cursor as keyset
+from ..internal import fast_json
+from ..internal import rank_index
+from ..internal import export
 from typing import Annotated, List
-from dacite import from_dict
+import hashlib
 
 router = APIRouter(
     prefix="/rational",
@@ -12,6 +17,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+rank_index.register("rational", orm.get_rational_collection, {"isRational": True})
+
 
 ################################################################################
 # Helper Functions
@@ -19,18 +26,39 @@ router = APIRouter(
 
 
 async def _retrieve_rational_tangles(
+    response: Response,
     start_id: str = None,
     crossing_num_min: int = 0,
     page_idx: int = 0,
     page_size: int = 100,
+    cursor: str = None,
 ):
     if page_size <= 0:
         raise HTTPException(status_code=404, detail="Page size must be positive")
     tangle_col = orm.get_rational_collection()
-    if start_id is None:
+    fields = fast_json.projection(orm.RationalTangDB)
+    start = rank_index.start_rank("rational", crossing_num_min)
+    if cursor is not None:
+        try:
+            after = keyset.decode_cursor("rational", cursor)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Invalid cursor")
         tangle_page = (
             await tangle_col.find(
-                {"crossing_num": {"$gte": crossing_num_min}, "isRational": True}
+                {"isRational": True} | keyset.keyset_filter(*after), fields
+            )
+            .sort([("crossing_num", 1), ("_id", 1)])
+            .limit(page_size)
+            .to_list(page_size)
+        )
+    elif start_id is None and start is not None:
+        tangle_page = await rank_index.get_page(
+            "rational", start + page_idx * page_size, page_size, fields
+        )
+    elif start_id is None:
+        tangle_page = (
+            await tangle_col.find(
+                {"crossing_num": {"$gte": crossing_num_min}, "isRational": True}, fields
             )
             .sort([("crossing_num", 1), ("_id", 1)])
             .limit(page_size)
@@ -48,7 +76,8 @@ async def _retrieve_rational_tangles(
                                 "_id": {"$gt": tangle_page[-1]["_id"]},
                             },
                         ],
-                    }
+                    },
+                    fields,
                 )
                 .sort([("crossing_num", 1), ("_id", 1)])
                 .limit(page_size)
@@ -66,20 +95,21 @@ async def _retrieve_rational_tangles(
                             "_id": {"$gt": start_id},
                         },
                     ],
-                }
+                },
+                fields,
             )
             .sort([("crossing_num", 1), ("_id", 1)])
             .limit(page_size)
             .to_list(page_size)
         )
-    return [from_dict(data_class=orm.RationalTangDB, data=tang) for tang in tangle_page]
+    keyset.set_next_cursor(response, "rational", tangle_page, page_size)
+    return tangle_page
 
 
 @router.get("/tangles", response_model=List[orm.RationalTangDB])
 async def retrieve_rational_tangles(
-    tangle_list: Annotated[
-        List[orm.RationalTangDB], Depends(_retrieve_rational_tangles)
-    ]
+    tangle_list: Annotated[List[dict], Depends(_retrieve_rational_tangles)],
+    response: Response,
 ):
     """Return the next rational job.
 
@@ -93,4 +123,110 @@ async def retrieve_rational_tangles(
     rational_Job
         The next rational Job.
     """
-    return tangle_list
+    return fast_json.tangle_response(tangle_list, orm.RationalTangDB, response)
+
+
+async def _retrieve_rational_page(crossing_num: int, page: int, page_exp: int):
+    if page < 0 or page_exp < 0:
+        raise HTTPException(status_code=404, detail="Page must be positive")
+    try:
+        rat_page = await page_index.get_page(crossing_num, page, page_exp)
+    except page_index.EmptyRationalError:
+        raise HTTPException(status_code=404, detail="Rational list is empty")
+    if not rat_page:
+        raise HTTPException(status_code=404, detail="Page out of range")
+    return rat_page
+
+
+@router.get("/pages/{crossing_num}/{page}", response_model=List[str])
+async def retrieve_rational_page(
+    rat_page: Annotated[List[str], Depends(_retrieve_rational_page)],
+    request: Request,
+    response: Response,
+):
+    """Return a page of unit interval rational tangle ids.
+
+    The page is tagged with an ETag of its contents so clients can cache it and
+    revalidate with ``If-None-Match``.
+
+    Parameters
+    ----------
+    rat_page : Annotated[List[str], Depends
+        The tangle ids of the page.
+    request : Request
+        The request, checked for ``If-None-Match``.
+    response : Response
+        The response to tag.
+
+    Returns
+    -------
+    List[str]
+        The tangle ids of the page, or an empty 304 response if the client holds
+        the current page.
+    """
+    digest = hashlib.sha256("\n".join(rat_page).encode()).hexdigest()
+    etag = f'"{digest}"'
+    max_age = config_store.cfg_dict["tangle-classes"]["rational"].get(
+        "page-max-age", 3600
+    )
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return rat_page
+
+
+@router.get("/tangle_counts")
+async def retrieve_tangle_counts() -> dict:
+    """Return the number of rational tangles at each crossing number.
+
+    The counts are known once the class is ranked, with them downloaders can split
+    a crossing number into independent ``page_idx`` ranges.
+
+    Returns
+    -------
+    dict
+        The tangle counts keyed by crossing number.
+    """
+    counts = rank_index.counts("rational")
+    if counts is None:
+        raise HTTPException(status_code=404, detail="Tangles are not ranked")
+    return counts
+
+
+@router.get("/export")
+async def export_rational_tangles(
+    fmt: Annotated[
+        export.ExportFormatEnum, Query(alias="format")
+    ] = export.ExportFormatEnum.ndjson,
+    crossing_num_min: int = 0,
+    crossing_num_max: int = None,
+    start_id: str = None,
+):
+    """Stream every rational tangle in a crossing number range.
+
+    Parameters
+    ----------
+    fmt : export.ExportFormatEnum, optional
+        Export as NDJSON, CSV, Arrow IPC stream or Parquet, by default NDJSON.
+    crossing_num_min : int, optional
+        The lowest crossing number to export, by default 0.
+    crossing_num_max : int, optional
+        The highest crossing number to export, by default no bound.
+    start_id : str, optional
+        The last ``_id`` received from an interrupted export to resume after.
+
+    Returns
+    -------
+    StreamingResponse
+        The tangles in ``(crossing_num, _id)`` order.
+    """
+    return await export.export_tangles(
+        orm.get_rational_collection(),
+        {"isRational": True},
+        orm.RationalTangDB,
+        fmt,
+        crossing_num_min,
+        crossing_num_max,
+        start_id,
+    )
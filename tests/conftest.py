@@ -7,6 +7,8 @@ from datetime import datetime, timedelta, timezone
 from tanglenomicon_data_api.internal import db_connector as dbc
 from tanglenomicon_data_api.internal import config_store as cfg
 from tanglenomicon_data_api.internal import job_queue
+from tanglenomicon_data_api.internal import rank_index
+from tanglenomicon_data_api.rational import page_index
 from jose import jwt
 
 
@@ -34,9 +36,9 @@ async def setup_job_queue(
     get_test_cfg,
 ):
     # stub the db connection.
-    job_queue._job_queue = {}
+    job_queue._job_queue = job_queue.JobQueue()
     yield  # Provide the data to the test
-    job_queue._job_queue = {}
+    job_queue._job_queue = job_queue.JobQueue()
     # Teardown: Clean up resources (if any) after the test
 
 
@@ -46,8 +48,12 @@ async def setup_database(
 ):
     # stub the db connection.
     dbc.db = AsyncMongoMockClient()["test_tanglenomicon"]
+    page_index.invalidate()
+    rank_index.invalidate()
     yield  # Provide the data to the test
     dbc.db = None
+    page_index.invalidate()
+    rank_index.invalidate()
     # Teardown: Clean up resources (if any) after the test
 
 
@@ -6,6 +6,7 @@ from httpx import AsyncClient, ASGITransport
 from fastapi import FastAPI
 
 from tanglenomicon_data_api.internal import security
+from tanglenomicon_data_api.internal import cursor as keyset
 from tanglenomicon_data_api.generic import presentation_endpoint
 from tanglenomicon_data_api.montesinos.job import MontesinosJob
 
@@ -49,6 +50,43 @@ async def test_retrieve_generic_tangles_positive(
         assert len(data) == 100
 
 
+@pytest.mark.anyio
+async def test_retrieve_generic_tangles_cursor(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        params = {"page_idx": 0, "page_size": 40}
+        for page_idx in range(3):
+            by_idx = await ac.get(
+                "/tangles", params={"page_idx": page_idx, "page_size": 40}
+            )
+            by_cursor = await ac.get("/tangles", params=params)
+            assert by_cursor.status_code == 200
+            assert by_cursor.json() == by_idx.json()
+            params = {
+                "cursor": by_cursor.headers["X-Next-Cursor"],
+                "page_size": 40,
+            }
+
+
+@pytest.mark.anyio
+async def test_retrieve_generic_tangles_invalid_cursor(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/tangles", params={"cursor": "not a cursor", "page_size": 10}
+        )
+        assert response.status_code == 404
+        foreign = keyset.encode_cursor("rational", 0, "")
+        response = await ac.get("/tangles", params={"cursor": foreign, "page_size": 10})
+        assert response.status_code == 404
+
+
 @pytest.mark.anyio
 async def test_retrieve_generic_tangles_empty_col(
     empty_rational_col,
@@ -0,0 +1,62 @@
+import pytest
+from fastapi import Response
+
+from tanglenomicon_data_api.internal import cursor as keyset
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+################################################################################
+################################################################################
+# Test cases for encode_cursor and decode_cursor
+################################################################################
+################################################################################
+
+
+async def test_decode_cursor_positive(get_test_cfg):
+    token = keyset.encode_cursor("rational", 7, "[1 2 3]")
+    assert keyset.decode_cursor("rational", token) == (7, "[1 2 3]")
+
+
+async def test_decode_cursor_wrong_scope(get_test_cfg):
+    token = keyset.encode_cursor("rational", 7, "[1 2 3]")
+    with pytest.raises(ValueError):
+        keyset.decode_cursor("montesinos", token)
+
+
+async def test_decode_cursor_tampered(get_test_cfg):
+    token = keyset.encode_cursor("rational", 7, "[1 2 3]")
+    header, payload, signature = token.split(".")
+    forged = keyset.encode_cursor("rational", 8, "[1 2 3]").split(".")[1]
+    with pytest.raises(ValueError):
+        keyset.decode_cursor("rational", ".".join([header, forged, signature]))
+    with pytest.raises(ValueError):
+        keyset.decode_cursor("rational", "not a cursor")
+
+
+################################################################################
+################################################################################
+# Test cases for set_next_cursor
+################################################################################
+################################################################################
+
+
+async def test_set_next_cursor_full_page(get_test_cfg):
+    response = Response()
+    page = [{"crossing_num": 3, "_id": "a"}, {"crossing_num": 4, "_id": "b"}]
+    keyset.set_next_cursor(response, "generic", page, 2)
+    token = response.headers[keyset.CURSOR_HEADER]
+    assert keyset.decode_cursor("generic", token) == (4, "b")
+
+
+async def test_set_next_cursor_last_page(get_test_cfg):
+    response = Response()
+    keyset.set_next_cursor(response, "generic", [{"crossing_num": 3, "_id": "a"}], 2)
+    assert keyset.CURSOR_HEADER not in response.headers
+    keyset.set_next_cursor(response, "generic", [], 0)
+    assert keyset.CURSOR_HEADER not in response.headers
@@ -0,0 +1,104 @@
+import pytest
+import sys
+from fastapi import HTTPException
+
+from tanglenomicon_data_api.internal import export
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def _tangles(count):
+    for i in range(count):
+        yield {"_id": f"t{i}", "crossing_num": i, "tv_array": [i, 0]}
+
+
+################################################################################
+################################################################################
+# Test cases for _rows
+################################################################################
+################################################################################
+
+
+async def test_rows_chunks(monkeypatch):
+    monkeypatch.setattr(export, "_CHUNK_ROWS", 2)
+    chunks = [
+        chunk
+        async for chunk in export._rows(
+            _tangles(5), ["_id", "tv_array"], export.ExportFormatEnum.ndjson
+        )
+    ]
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+    assert chunks[0].splitlines()[0] == '{"_id": "t0", "tv_array": [0, 0]}'
+
+
+async def test_rows_csv():
+    chunks = [
+        chunk
+        async for chunk in export._rows(
+            _tangles(2), ["_id", "tv_array"], export.ExportFormatEnum.csv
+        )
+    ]
+    assert "".join(chunks) == '_id,tv_array\nt0,"[0, 0]"\nt1,"[1, 0]"\n'
+
+
+async def test_rows_empty():
+    chunks = [
+        chunk
+        async for chunk in export._rows(
+            _tangles(0), ["_id"], export.ExportFormatEnum.ndjson
+        )
+    ]
+    assert chunks == []
+
+
+################################################################################
+################################################################################
+# Test cases for _batches
+################################################################################
+################################################################################
+
+
+async def test_batches_arrow(monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    from tanglenomicon_data_api.rational.orm import RationalTangDB
+
+    monkeypatch.setattr(export, "_BATCH_SIZE", 2)
+    tangles = [
+        {
+            "_id": f"t{i}",
+            "twist_vector": f"[{i}]",
+            "crossing_num": i,
+            "tv_array": [i, 0],
+            "in_unit_interval": i % 2 == 0,
+        }
+        for i in range(5)
+    ]
+
+    async def _docs():
+        for tang in tangles:
+            yield tang
+
+    chunks = [
+        chunk
+        async for chunk in export._batches(
+            pa, _docs(), RationalTangDB, export.ExportFormatEnum.arrow
+        )
+    ]
+    assert len(chunks) == 3
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.schema.field("crossing_num").type == pa.int64()
+    assert table.schema.field("tv_array").type == pa.list_(pa.int64())
+    assert table.schema.field("in_unit_interval").type == pa.bool_()
+    assert table.to_pylist() == tangles
+
+
+async def test_load_pyarrow_missing(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(HTTPException) as e:
+        export._load_pyarrow()
+    assert e.value.status_code == 501
@@ -0,0 +1,69 @@
+import pytest
+import json
+from fastapi import Response
+
+from tanglenomicon_data_api.internal import fast_json
+from tanglenomicon_data_api.rational.orm import RationalTangDB
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+tangle = {
+    "_id": "[1 2 0]",
+    "twist_vector": "[1 2 0]",
+    "crossing_num": 3,
+    "tv_array": [0, 1, 2],
+    "in_unit_interval": True,
+    "isRational": True,
+}
+
+
+################################################################################
+################################################################################
+# Test cases for projection
+################################################################################
+################################################################################
+
+
+async def test_projection_positive():
+    assert fast_json.projection(RationalTangDB) == {
+        "_id": 1,
+        "twist_vector": 1,
+        "crossing_num": 1,
+        "tv_array": 1,
+        "in_unit_interval": 1,
+    }
+
+
+################################################################################
+################################################################################
+# Test cases for tangle_response
+################################################################################
+################################################################################
+
+
+async def test_tangle_response_positive():
+    response = Response()
+    response.headers["X-Next-Cursor"] = "cursor"
+    fast = fast_json.tangle_response([tangle], RationalTangDB, response)
+    assert fast.headers["X-Next-Cursor"] == "cursor"
+    assert fast.headers["content-type"] == "application/json"
+    assert int(fast.headers["content-length"]) == len(fast.body)
+    expected = {k: v for k, v in tangle.items() if k != "isRational"}
+    assert json.loads(fast.body) == [expected]
+
+
+async def test_tangle_response_std_encoder(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+    fast = fast_json.tangle_response([tangle], RationalTangDB, Response())
+    assert json.loads(fast.body)[0]["tv_array"] == [0, 1, 2]
+
+
+async def test_tangle_response_empty():
+    fast = fast_json.tangle_response([], RationalTangDB, Response())
+    assert fast.body == b"[]"
@@ -1,5 +1,5 @@
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from httpx import AsyncClient, ASGITransport
 from anyio import move_on_after
@@ -163,6 +163,34 @@ async def test_get_job_statistics_nonexistent(get_test_cfg, setup_job_queue):
     }
 
 
+@pytest.mark.anyio
+async def test_get_job_statistics_by_client(get_test_cfg, setup_job_queue):
+    for i in range(3):
+        job_id = f"new {i}"
+        jq._job_queue[job_id] = MockClass(
+            cur_state=JobStateEnum.new,
+            timestamp=datetime.now(timezone.utc),
+            job_id=job_id,
+        )
+    user = User(username="client")
+    await jq.get_next_job(MockClass, user)
+    await jq.get_next_job(MockClass, user)
+    await jq.mark_job_complete(
+        MockClass(job_id="new 0", timestamp=datetime.now(timezone.utc)), user
+    )
+    data = await jq.get_job_statistics(MockClass, by_client=True)
+    assert data == {
+        "queue_length": 3,
+        "new": 1,
+        "pending": 1,
+        "complete": 1,
+        "clients": {
+            "unassigned": {"new": 1, "pending": 0, "complete": 0},
+            "client": {"new": 0, "pending": 1, "complete": 1},
+        },
+    }
+
+
 ################################################################################
 ################################################################################
 # Test cases for the task_clean_stale_jobs endpoint
@@ -240,6 +268,38 @@ async def test_clean_stale_jobs_empty(get_test_cfg, setup_job_queue):
     assert len(all_ent) == 9
 
 
+@pytest.mark.anyio
+async def test_clean_stale_jobs_expired_leases_only(get_test_cfg, setup_job_queue):
+
+    stale = cfg.cfg_dict["job-queue"]["clocks"]["stale"]
+    old = datetime.now(timezone.utc) - timedelta(seconds=stale + 1)
+    for i in range(2):
+        job_id = f"expired {i}"
+        jq._job_queue[job_id] = GenerationJob(
+            cur_state=JobStateEnum.pending, timestamp=old, job_id=job_id
+        )
+    jq._job_queue["leased"] = GenerationJob(
+        cur_state=JobStateEnum.pending,
+        timestamp=datetime.now(timezone.utc),
+        job_id="leased",
+    )
+    assert jq._seconds_to_next_stale() == 0
+    await jq._clean_stale_jobs()
+    assert jq._job_queue.ids(GenerationJob, JobStateEnum.new) == [
+        "expired 0",
+        "expired 1",
+    ]
+    assert jq._job_queue["leased"].cur_state == JobStateEnum.pending
+    assert 0 < jq._seconds_to_next_stale() <= stale
+
+    # A re-leased job is measured from its new lease.
+    res = await jq.get_next_job(GenerationJob, User(username="client"))
+    assert res.job_id == "expired 0"
+    assert res.timestamp > old
+    await jq._clean_stale_jobs()
+    assert res.cur_state == JobStateEnum.pending
+
+
 ################################################################################
 ################################################################################
 # Test cases for the task_clean_complete_jobs endpoint
@@ -288,6 +348,28 @@ async def test_task_clean_complete_jobs_positive(get_test_cfg, setup_job_queue):
     assert len(all_ent) == 8
 
 
+class PartlyStoredClass(MockClass):
+    @classmethod
+    async def store_many(cls, jobs):
+        return [job.item % 2 == 0 for job in jobs]
+
+
+@pytest.mark.anyio
+async def test_clean_complete_jobs_keeps_unstored(get_test_cfg, setup_job_queue):
+    for i in range(5):
+        job_id = f"complete {i}"
+        jq._job_queue[job_id] = PartlyStoredClass(
+            cur_state=JobStateEnum.complete,
+            timestamp=datetime.now(timezone.utc),
+            job_id=job_id,
+            item=i,
+        )
+    await jq._clean_complete_jobs()
+    # Jobs that were not stored stay complete for the next flush.
+    assert sorted(jq._job_queue) == ["complete 1", "complete 3"]
+    assert jq._get_count_complete() == 2
+
+
 @pytest.mark.anyio
 async def test_task_clean_complete_jobs_empty(get_test_cfg, setup_job_queue):
 
@@ -476,3 +558,73 @@ async def test_get_next_job_empty_queue(get_test_cfg, setup_job_queue):
     user = User(username=client_id)
     res = await jq.get_next_job(MockClass, user)
     assert res == None
+
+
+@pytest.mark.anyio
+async def test_get_next_job_in_queue_order(get_test_cfg, setup_job_queue):
+
+    client_id = "client"
+    user = User(username=client_id)
+    for i in range(3):
+        job_id = f"new {i}"
+        jq._job_queue[job_id] = MockClass(
+            cur_state=JobStateEnum.new,
+            timestamp=datetime.now(timezone.utc),
+            job_id=job_id,
+        )
+    jq._job_queue["pending"] = MockClass(
+        cur_state=JobStateEnum.pending,
+        timestamp=datetime.now(timezone.utc),
+        job_id="pending",
+    )
+    for i in range(3):
+        res = await jq.get_next_job(MockClass, user)
+        assert res.job_id == f"new {i}"
+    assert await jq.get_next_job(MockClass, user) == None
+    assert jq._job_queue.ids(MockClass, JobStateEnum.new) == []
+    assert len(jq._job_queue.ids(MockClass, JobStateEnum.pending)) == 4
+
+
+################################################################################
+################################################################################
+# Test cases for the JobQueue index
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_job_queue_index_tracks_state(get_test_cfg, setup_job_queue):
+
+    job = MockClass(
+        cur_state=JobStateEnum.new,
+        timestamp=datetime.now(timezone.utc),
+        job_id="a job",
+    )
+    jq._job_queue[job.job_id] = job
+    assert jq._job_queue.ids(GenerationJob, JobStateEnum.new) == ["a job"]
+    jq._job_queue.set_state(job.job_id, JobStateEnum.complete)
+    assert job.cur_state == JobStateEnum.complete
+    assert jq._job_queue.ids(MockClass, JobStateEnum.new) == []
+    assert jq._job_queue.ids(MockClass, JobStateEnum.complete) == ["a job"]
+    del jq._job_queue[job.job_id]
+    assert jq._job_queue.ids(MockClass, JobStateEnum.complete) == []
+    assert len(jq._job_queue) == 0
+
+
+@pytest.mark.anyio
+async def test_get_next_jobs_partial_batch(get_test_cfg, setup_job_queue):
+
+    user = User(username="client")
+    for i in range(2):
+        job_id = f"new {i}"
+        jq._job_queue[job_id] = MockClass(
+            cur_state=JobStateEnum.new,
+            timestamp=datetime.now(timezone.utc),
+            job_id=job_id,
+        )
+    res = await jq.get_next_jobs(MockClass, user, 5)
+    assert [j.job_id for j in res] == ["new 0", "new 1"]
+    for j in res:
+        assert j.cur_state == JobStateEnum.pending
+        assert j.client_id == "client"
+    assert await jq.get_next_jobs(MockClass, user, 5) == []
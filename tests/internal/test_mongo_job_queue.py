@@ -0,0 +1,201 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import ClassVar
+
+from tanglenomicon_data_api.interfaces.job import (
+    GenerationJob,
+    GenerationJobResults,
+    JobStateEnum,
+)
+from tanglenomicon_data_api.internal.security import User
+from tanglenomicon_data_api.internal.mongo_job_queue import MongoJobQueue
+from tanglenomicon_data_api.internal import job_queue as jq
+from tanglenomicon_data_api.internal import db_connector as dbc
+
+
+class MockResults(GenerationJobResults):
+    value: int = 0
+
+
+class MockMongoJob(GenerationJob):
+    item: int = 0
+    _results: MockResults = None
+
+    stored: ClassVar[list] = []
+
+    async def store(self):
+        MockMongoJob.stored.append(self)
+        return True
+
+    def update_results(self, results):
+        self._results = results
+
+
+class PartlyStoredMongoJob(MockMongoJob):
+    @classmethod
+    async def store_many(cls, jobs):
+        MockMongoJob.stored.extend(jobs)
+        return [job.item % 2 == 0 for job in jobs]
+
+
+pytestmark = pytest.mark.anyio
+
+
+test_path = Path.cwd() / Path("tests/internal")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def setup_mongo_job_queue(get_test_cfg, setup_database):
+    col = dbc.db["job_queue"]
+    await col.delete_many({})
+    jq._mongo_job_queue = MongoJobQueue(col)
+    MockMongoJob.stored = []
+    yield col
+    jq._mongo_job_queue = None
+    await col.delete_many({})
+
+
+async def _enqueue_new(count: int):
+    for i in range(count):
+        job = MockMongoJob(
+            timestamp=datetime.now(timezone.utc), job_id=f"new {i}", item=i
+        )
+        assert await jq.enqueue_job(job)
+
+
+################################################################################
+################################################################################
+# Test cases for the enqueue_job function
+################################################################################
+################################################################################
+
+
+async def test_mongo_enqueue_job_in_queue(setup_mongo_job_queue):
+    await _enqueue_new(1)
+    job = MockMongoJob(timestamp=datetime.now(timezone.utc), job_id="new 0")
+    assert await jq.enqueue_job(job) == False
+    assert await jq.is_enqueued("new 0")
+    assert not await jq.is_enqueued("new 1")
+
+
+################################################################################
+################################################################################
+# Test cases for the get_next_job(s) functions
+################################################################################
+################################################################################
+
+
+async def test_mongo_get_next_jobs_leases_once(setup_mongo_job_queue):
+    await _enqueue_new(3)
+    user = User(username="client")
+    job = await jq.get_next_job(MockMongoJob, user)
+    assert job.job_id == "new 0"
+    assert job.item == 0
+    assert job.cur_state == JobStateEnum.pending
+    assert job.client_id == "client"
+    jobs = await jq.get_next_jobs(GenerationJob, User(username="other"), 5)
+    assert [j.job_id for j in jobs] == ["new 1", "new 2"]
+    assert await jq.get_next_job(MockMongoJob, user) == None
+
+
+################################################################################
+################################################################################
+# Test cases for the mark_job(s)_complete functions
+################################################################################
+################################################################################
+
+
+async def test_mongo_mark_jobs_complete(setup_mongo_job_queue):
+    await _enqueue_new(2)
+    user = User(username="client")
+    await jq.get_next_jobs(MockMongoJob, user, 2)
+    res = await jq.mark_jobs_complete(
+        [
+            MockResults(job_id="new 0", value=7),
+            MockResults(job_id="missing"),
+        ],
+        user,
+    )
+    assert res == [True, False]
+    assert not await jq.mark_job_complete(
+        MockResults(job_id="new 1"), User(username="other")
+    )
+    assert await jq.get_job_statistics(MockMongoJob, by_client=True) == {
+        "queue_length": 2,
+        "new": 0,
+        "pending": 1,
+        "complete": 1,
+        "clients": {"client": {"new": 0, "pending": 1, "complete": 1}},
+    }
+
+
+################################################################################
+################################################################################
+# Test cases for the stale and complete cleanup
+################################################################################
+################################################################################
+
+
+async def test_mongo_clean_stale_jobs(setup_mongo_job_queue):
+    col = setup_mongo_job_queue
+    await _enqueue_new(2)
+    user = User(username="client")
+    await jq.get_next_jobs(MockMongoJob, user, 2)
+    await col.update_one(
+        {"_id": "new 0"},
+        {"$set": {"lease_expire": datetime.now(timezone.utc) - timedelta(seconds=1)}},
+    )
+    await jq._clean_stale_jobs()
+    stats = await jq.get_job_statistics(MockMongoJob)
+    assert stats["new"] == 1
+    assert stats["pending"] == 1
+    job = await jq.get_next_job(MockMongoJob, user)
+    assert job.job_id == "new 0"
+
+
+async def test_mongo_clean_complete_jobs(setup_mongo_job_queue):
+    await _enqueue_new(3)
+    user = User(username="client")
+    await jq.get_next_jobs(MockMongoJob, user, 3)
+    await jq.mark_jobs_complete(
+        [MockResults(job_id="new 0", value=1), MockResults(job_id="new 2", value=3)],
+        user,
+    )
+    await jq._clean_complete_jobs()
+    assert sorted(j.job_id for j in MockMongoJob.stored) == ["new 0", "new 2"]
+    assert sorted(j._results.value for j in MockMongoJob.stored) == [1, 3]
+    stats = await jq.get_job_statistics(MockMongoJob)
+    assert stats["queue_length"] == 1
+    assert stats["complete"] == 0
+
+
+async def test_mongo_clean_complete_jobs_keeps_unstored(setup_mongo_job_queue):
+    for i in range(3):
+        job = PartlyStoredMongoJob(
+            timestamp=datetime.now(timezone.utc), job_id=f"new {i}", item=i
+        )
+        assert await jq.enqueue_job(job)
+    user = User(username="client")
+    await jq.get_next_jobs(PartlyStoredMongoJob, user, 3)
+    await jq.mark_jobs_complete(
+        [MockResults(job_id=f"new {i}", value=i) for i in range(3)], user
+    )
+    await jq._clean_complete_jobs()
+    # The job that was not stored stays complete and unclaimed.
+    doc = await setup_mongo_job_queue.find_one({})
+    assert doc["_id"] == "new 1"
+    assert doc["state"] == JobStateEnum.complete.value
+    assert doc["flush_token"] is None
+    await jq._clean_complete_jobs()
+    assert [j.job_id for j in MockMongoJob.stored] == [
+        "new 0",
+        "new 1",
+        "new 2",
+        "new 1",
+    ]
@@ -0,0 +1,169 @@
+import asyncio
+import pytest
+
+from tanglenomicon_data_api.internal import config_store as cfg
+from tanglenomicon_data_api.internal import rank_index
+from tanglenomicon_data_api.montesinos import orm as mont_orm
+
+pytestmark = pytest.mark.anyio
+
+rank_index.register(
+    "montesinos", mont_orm.get_montesinos_collection, {"isMontesinos": True}
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def rank_montesinos(get_test_cfg, monkeypatch):
+    monkeypatch.setitem(cfg.cfg_dict["tangle-classes"]["montesinos"], "rank", True)
+
+
+async def _sorted_tangles():
+    return (
+        await mont_orm.get_montesinos_collection()
+        .find({"isMontesinos": True})
+        .sort([("crossing_num", 1), ("_id", 1)])
+        .to_list(None)
+    )
+
+
+################################################################################
+################################################################################
+# Test cases for ensure_ranked
+################################################################################
+################################################################################
+
+
+async def test_ensure_ranked_positive(rank_montesinos, valid_montesinos_col):
+    assert rank_index.start_rank("montesinos", 0) is None
+    await rank_index.ensure_ranked("montesinos")
+    tangles = await _sorted_tangles()
+    assert [tang["montesinos_rank"] for tang in tangles] == list(range(len(tangles)))
+    counts = rank_index.counts("montesinos")
+    assert sum(counts.values()) == len(tangles)
+    for crossing_num, count in counts.items():
+        assert count == len([t for t in tangles if t["crossing_num"] == crossing_num])
+    first_5 = [t["crossing_num"] >= 5 for t in tangles].index(True)
+    assert rank_index.start_rank("montesinos", 5) == first_5
+    assert rank_index.start_rank("montesinos", 100) == len(tangles)
+
+
+async def test_ensure_ranked_loads_ranks(rank_montesinos, valid_montesinos_col):
+    await rank_index.ensure_ranked("montesinos")
+    counts = rank_index.counts("montesinos")
+    rank_index.invalidate("montesinos")
+    assert rank_index.counts("montesinos") is None
+    col = mont_orm.get_montesinos_collection()
+    await col.update_many({}, {"$unset": {"montesinos_rank": ""}})
+    await rank_index.ensure_ranked("montesinos")
+    assert rank_index.counts("montesinos") == counts
+    rank_index.invalidate("montesinos")
+    await rank_index.ensure_ranked("montesinos")
+    assert rank_index.counts("montesinos") == counts
+
+
+async def test_ensure_ranked_new_tangle(rank_montesinos, valid_montesinos_col):
+    await rank_index.ensure_ranked("montesinos")
+    col = mont_orm.get_montesinos_collection()
+    await col.insert_one({"_id": "+[1 1 0]", "crossing_num": 2, "isMontesinos": True})
+    rank_index.invalidate("montesinos")
+    await rank_index.ensure_ranked("montesinos")
+    assert rank_index.start_rank("montesinos", 0) == 0
+    assert rank_index.counts("montesinos")[2] == 1
+    page = await rank_index.get_page("montesinos", 0, 2)
+    assert [t["_id"] for t in page] == [t["_id"] for t in await _sorted_tangles()][:2]
+
+
+async def test_ensure_ranked_incremental(
+    rank_montesinos, valid_montesinos_col, monkeypatch
+):
+    await rank_index.ensure_ranked("montesinos")
+    col = mont_orm.get_montesinos_collection()
+    writes = []
+
+    class RecordingCollection:
+        def __getattr__(self, name):
+            return getattr(col, name)
+
+        async def bulk_write(self, requests, **kwargs):
+            writes.append(len(requests))
+            return await col.bulk_write(requests, **kwargs)
+
+    monkeypatch.setattr(
+        rank_index._classes["montesinos"], "get_collection", RecordingCollection
+    )
+    monkeypatch.setattr(rank_index, "_BULK_SIZE", 10)
+    tangles = await _sorted_tangles()
+    top = tangles[-1]["crossing_num"]
+    # A tangle last in the order only writes its own rank.
+    await col.insert_one({"_id": "~", "crossing_num": top, "isMontesinos": True})
+    rank_index.invalidate("montesinos")
+    await rank_index.ensure_ranked("montesinos")
+    assert writes == [1]
+    assert (await col.find_one({"_id": "~"}))["montesinos_rank"] == len(tangles)
+    # A tangle first in the order moves every rank, written in bulks.
+    writes.clear()
+    await col.insert_one({"_id": "+[1 1 0]", "crossing_num": 2, "isMontesinos": True})
+    rank_index.invalidate("montesinos")
+    await rank_index.ensure_ranked("montesinos")
+    assert sum(writes) == len(tangles) + 2
+    assert max(writes) == 10
+    tangles = await _sorted_tangles()
+    assert [tang["montesinos_rank"] for tang in tangles] == list(range(len(tangles)))
+    assert sum(rank_index.counts("montesinos").values()) == len(tangles)
+
+
+async def test_ensure_ranked_disabled(get_test_cfg, valid_montesinos_col):
+    await rank_index.ensure_ranked("montesinos")
+    assert rank_index.start_rank("montesinos", 0) is None
+    assert rank_index.counts("montesinos") is None
+
+
+async def test_ensure_ranked_empty_col(rank_montesinos, empty_montesinos_col):
+    await rank_index.ensure_ranked("montesinos")
+    assert rank_index.counts("montesinos") == {}
+    assert rank_index.start_rank("montesinos", 0) == 0
+
+
+################################################################################
+################################################################################
+# Test cases for task_rank_tangles
+################################################################################
+################################################################################
+
+
+async def test_task_rank_tangles_external_writer(
+    rank_montesinos, valid_montesinos_col, monkeypatch
+):
+    monkeypatch.setitem(cfg.cfg_dict["job-queue"]["clocks"], "rank", 0.05)
+    await rank_index.ensure_ranked("montesinos")
+    counts = rank_index.counts("montesinos")
+    # Another process inserts a tangle, this process is not invalidated.
+    col = mont_orm.get_montesinos_collection()
+    await col.insert_one({"_id": "+[1 1 0]", "crossing_num": 2, "isMontesinos": True})
+    task = asyncio.create_task(rank_index.task_rank_tangles())
+    try:
+        await asyncio.sleep(0.2)
+    finally:
+        task.cancel()
+    assert rank_index.counts("montesinos") == {2: 1} | counts
+    tangles = await _sorted_tangles()
+    assert [tang["montesinos_rank"] for tang in tangles] == list(range(len(tangles)))
+    # Another process ranks its tangle first, the total no longer matches.
+    await col.insert_one({"_id": "~", "crossing_num": 2, "isMontesinos": True})
+    ranked = rank_index._classes["montesinos"]
+    offsets, total = ranked.offsets, ranked.total
+    await rank_index._rank(ranked, 2)
+    ranked.offsets, ranked.total = offsets, total
+    task = asyncio.create_task(rank_index.task_rank_tangles())
+    try:
+        await asyncio.sleep(0.2)
+    finally:
+        task.cancel()
+    assert rank_index.counts("montesinos")[2] == 2
+    tangles = await _sorted_tangles()
+    assert [tang["montesinos_rank"] for tang in tangles] == list(range(len(tangles)))
@@ -108,6 +108,86 @@ async def test_retrieve_montesinos_job_jq_empty(
         assert jq._job_queue[data["job_id"]].rat_lists == data["rat_lists"]
 
 
+################################################################################
+################################################################################
+# Test cases for the retrieve_montesinos_jobs endpoint
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_retrieve_montesinos_jobs_mock_jq(
+    get_test_cfg,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+    get_test_jwt,
+):
+    for i in range(5):
+        job_id = f"new {i}"
+        job = MontesinosJob(
+            cur_state=JobStateEnum.new,
+            timestamp=datetime.now(timezone.utc),
+            job_id=job_id,
+            crossing_num=0,
+            rat_lists=[["h", "e", "l", "l", "o"], ["w", "o", "r", "l", "d", "!"]],
+        )
+        jq._job_queue[job_id] = job
+    headers = {"Authorization": f"Bearer {get_test_jwt}"}
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/montesinos/jobs", params={"count": 3}, headers=headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [j["job_id"] for j in data] == ["new 0", "new 1", "new 2"]
+        for j in data:
+            assert j["cur_state"] == "pending"
+            assert j["client_id"] == "a username"
+            assert jq._job_queue[j["job_id"]].cur_state == JobStateEnum.pending
+
+
+@pytest.mark.anyio
+async def test_retrieve_montesinos_jobs_jq_empty(
+    get_test_cfg,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+    get_test_jwt,
+):
+    headers = {"Authorization": f"Bearer {get_test_jwt}"}
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/montesinos/jobs", params={"count": 3}, headers=headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 3
+        assert len(set(j["job_id"] for j in data)) == 3
+        for j in data:
+            assert j["cur_state"] == "pending"
+            assert len(j["rat_lists"]) > 0
+
+
+@pytest.mark.anyio
+async def test_retrieve_montesinos_jobs_bad_count(
+    get_test_cfg,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+    get_test_jwt,
+):
+    headers = {"Authorization": f"Bearer {get_test_jwt}"}
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/montesinos/jobs", params={"count": 0}, headers=headers
+        )
+        assert response.status_code == 404
+
+
 ################################################################################
 ################################################################################
 # Test cases for the report_montesinos_job endpoint
@@ -216,3 +296,52 @@ async def test_report_montesinos_job_not_assigned_to_user(
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post("/montesinos/job", json=data, headers=headers)
         assert response.status_code != 200
+
+
+################################################################################
+################################################################################
+# Test cases for the report_montesinos_jobs endpoint
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_report_montesinos_jobs_mixed(
+    get_test_cfg,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+    get_test_jwt,
+):
+    client_id = "a username"
+    for i in range(3):
+        job_id = f"Built job {i}"
+        jq._job_queue[job_id] = MontesinosJob(
+            cur_state=JobStateEnum.pending,
+            timestamp=datetime.now(timezone.utc),
+            crossing_num=0,
+            job_id=job_id,
+            client_id=client_id if i < 2 else f"not {client_id}",
+            rat_lists=[],
+        )
+
+    headers = {
+        "Authorization": f"Bearer {get_test_jwt}",
+        "Content-Type": "application/json",
+    }
+    data = [
+        {"job_id": f"Built job {i}", "mont_list": [f"tangle {i}"]} for i in range(3)
+    ] + [{"job_id": "not a job", "mont_list": []}]
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post("/montesinos/jobs", json=data, headers=headers)
+        assert response.status_code == 200
+        res = response.json()
+        assert [r["accepted"] for r in res] == [True, True, False, False]
+        assert [r["job_id"] for r in res] == [d["job_id"] for d in data]
+
+        for i in range(2):
+            job = jq._job_queue[f"Built job {i}"]
+            assert job.cur_state == JobStateEnum.complete
+            assert job._results.mont_list == [f"tangle {i}"]
+        assert jq._job_queue["Built job 2"].cur_state == JobStateEnum.pending
@@ -1,21 +1,26 @@
 """Unit tests for the montesinos module."""
 
 import pytest
+import asyncio
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from mongomock_motor import AsyncMongoMockClient
 from pathlib import Path
+from pymongo.errors import BulkWriteError
 from tanglenomicon_data_api.montesinos.job import (
     get_jobs,
     startup_task,
+    task_fill_job_queue,
     MontesinosJob,
     MontesinosJobResults,
 )
+from tanglenomicon_data_api.montesinos import job as mj
+from tanglenomicon_data_api.rational import page_index
 from tanglenomicon_data_api.internal import config_store as cfg
 from tanglenomicon_data_api.internal import job_queue as jq
 from tanglenomicon_data_api.internal import db_connector as dbc
 from tanglenomicon_data_api.interfaces.job import JobStateEnum
-
+from tanglenomicon_data_api.internal.security import User
 
 pytestmark = pytest.mark.anyio
 
@@ -124,6 +129,245 @@ async def test_get_jobs_request_zero(
     ...
 
 
+async def test_get_jobs_builds_concurrently(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+    monkeypatch,
+):
+    monkeypatch.setitem(
+        cfg.cfg_dict["tangle-classes"]["montesinos"], "build-concurrency", 2
+    )
+    in_flight = []
+    peak = []
+    build = mj._build_job
+
+    async def tracking_build_job(*args, **kwargs):
+        in_flight.append(None)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return await build(*args, **kwargs)
+
+    monkeypatch.setattr(mj, "_build_job", tracking_build_job)
+    await get_jobs(4)
+    assert max(peak) == 2
+    stats = await jq.get_job_statistics(MontesinosJob)
+    assert stats["new"] == 4
+
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    open_jobs = set()
+    async for s in col.find({}):
+        open_jobs.update(j["job_id"] for j in s["open_jobs"])
+    assert open_jobs == set(jq._job_queue)
+
+
+async def test_get_jobs_replans_moved_stencils(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    empty_montesinos_stencil_col,
+    monkeypatch,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_one(
+        {
+            "stencil_array": [11, 10],
+            "str_rep": "11 10",
+            "crossing_num": 21,
+            "head": [0, 0],
+            "state": 1,
+            "page_exp": 5,
+            "open_jobs": [],
+        }
+    )
+    page_count = mj.page_index.page_count
+    moved = []
+
+    async def racing_page_count(cn, page_exp):
+        if not moved:
+            # Another process claims the first two pages after our read.
+            moved.append(None)
+            await col.update_one(
+                {"str_rep": "11 10"},
+                {
+                    "$set": {"head": [2, 0]},
+                    "$push": {
+                        "open_jobs": {
+                            "$each": [
+                                {"job_id": "other 0", "cursor": [0, 0]},
+                                {"job_id": "other 1", "cursor": [1, 0]},
+                            ]
+                        }
+                    },
+                },
+            )
+        return await page_count(cn, page_exp)
+
+    monkeypatch.setattr(mj.page_index, "page_count", racing_page_count)
+    await get_jobs(2)
+    stencil = await col.find_one({"str_rep": "11 10"})
+    cursors = [j["cursor"] for j in stencil["open_jobs"]]
+    assert cursors == [[0, 0], [1, 0], [2, 0], [3, 0]]
+    assert stencil["head"] == [4, 0]
+    assert (await jq.get_job_statistics(MontesinosJob))["new"] == 2
+
+
+async def test_get_jobs_releases_unbuilt_stencils(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+    monkeypatch,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    before = {s["str_rep"]: s async for s in col.find({})}
+
+    async def failing_build_job(*args, **kwargs):
+        raise page_index.EmptyRationalError("Rational list is empty.")
+
+    monkeypatch.setattr(mj, "_build_job", failing_build_job)
+    await get_jobs(2)
+    after = {s["str_rep"]: s async for s in col.find({})}
+    for str_rep, stencil in before.items():
+        assert after[str_rep]["head"] == stencil["head"]
+        assert after[str_rep]["open_jobs"] == stencil["open_jobs"]
+    assert after["10 10"]["state"] == before["10 10"]["state"]
+    assert "page_exp" not in after["10 10"]
+    # The released stencils are planned again once jobs can be built.
+    monkeypatch.undo()
+    await get_jobs(1)
+    assert (await jq.get_job_statistics(MontesinosJob))["new"] == 1
+
+
+async def _insert_unranked_stencils():
+    # Stencils started before rational pages were ranked have no page exponent.
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    for stencil_array, state in [([10, 11], 1), ([2, 10, 10], 2)]:
+        str_rep = " ".join(map(str, stencil_array))
+        await col.insert_one(
+            {
+                "stencil_array": stencil_array,
+                "str_rep": str_rep,
+                "crossing_num": sum(stencil_array),
+                "head": [1] + [0] * (len(stencil_array) - 1),
+                "state": state,
+                "open_jobs": [
+                    {"job_id": f"old {str_rep}", "cursor": [0] * len(stencil_array)}
+                ],
+            }
+        )
+    return col
+
+
+async def test_get_jobs_resets_unranked_stencils(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    empty_montesinos_stencil_col,
+):
+    col = await _insert_unranked_stencils()
+    await get_jobs(1)
+    stencil = await col.find_one({"str_rep": "10 11"})
+    assert [job["cursor"] for job in stencil["open_jobs"]] == [[0, 0]]
+    assert stencil["open_jobs"][0]["job_id"] != "old 10 11"
+    assert stencil["page_exp"] is not None
+    # Stencils without headroom are not planned, startup_task resets them.
+    stencil = await col.find_one({"str_rep": "2 10 10"})
+    assert stencil["open_jobs"] == [{"job_id": "old 2 10 10", "cursor": [0, 0, 0]}]
+
+
+async def test_get_jobs_shares_pages(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col,
+    monkeypatch,
+):
+    monkeypatch.setattr(mj, "_page_cache", mj.PageCache(0))
+    await get_jobs(5)
+    pages = dict()
+    for i in jq._job_queue:
+        job = jq._job_queue[i]
+        for cn, rat_page in zip(map(int, job.stencil.split()), job.rat_lists):
+            pages.setdefault((cn, tuple(rat_page)), set()).add(id(rat_page))
+    assert all(len(ids) == 1 for ids in pages.values())
+    assert len(pages) < sum(len(jq._job_queue[i].rat_lists) for i in jq._job_queue)
+
+
+async def test_get_jobs_page_references(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col,
+    monkeypatch,
+):
+    monkeypatch.setitem(
+        cfg.cfg_dict["tangle-classes"]["montesinos"], "job-format", "pages"
+    )
+    await get_jobs(2)
+    jobs = [
+        jq._job_queue[i]
+        for i in jq._job_queue
+        if isinstance(jq._job_queue[i], MontesinosJob)
+    ]
+    assert len(jobs) == 2
+    for job in jobs:
+        assert job.rat_lists == []
+        assert [ref.crossing_num for ref in job.rat_pages] == list(
+            map(int, job.stencil.split())
+        )
+        assert all(ref.page_exp == 8 for ref in job.rat_pages)
+
+
+async def test_move_head_skips_symmetric_heads(get_test_cfg):
+    stencil = mj.orm.StencilDB(
+        _id=None,
+        stencil_array=[10, 10],
+        str_rep="10 10",
+        crossing_num=20,
+        head=[0, 0],
+        state=0,
+        open_jobs=[],
+    )
+    heads = [list(stencil.head)]
+    while mj._move_head(stencil, [3, 3]) == mj.orm.StencilHeadStateEnum.headroom:
+        heads.append(list(stencil.head))
+    assert heads == [[0, 0], [0, 1], [1, 1], [0, 2], [1, 2], [2, 2]]
+
+
+async def test_get_jobs_skips_redundant_stencils(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    empty_montesinos_stencil_col,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    for stencil_array, state in [([11, 10], 0), ([10, 11], 3)]:
+        await col.insert_one(
+            {
+                "stencil_array": stencil_array,
+                "str_rep": " ".join(map(str, stencil_array)),
+                "crossing_num": 21,
+                "head": [0, 0],
+                "state": state,
+                "open_jobs": [],
+            }
+        )
+    await get_jobs(1)
+    assert len(jq._job_queue) == 0
+    stencil = await col.find_one({"str_rep": "11 10"})
+    assert stencil["state"] == 3
+
+
 ################################################################################
 ################################################################################
 # Test cases for the startup_task function
@@ -192,6 +436,68 @@ async def test_startup_task_positive_all_new(
     ...
 
 
+async def test_startup_task_resets_unranked_stencils(
+    get_test_cfg,
+    setup_job_queue,
+    valid_rational_col,
+    empty_montesinos_stencil_col,
+):
+    col = await _insert_unranked_stencils()
+    await startup_task()
+    # The old cursors are not recovered, the stencils are planned from the start.
+    assert "old 10 11" not in jq._job_queue
+    assert "old 2 10 10" not in jq._job_queue
+    stencils = {s["str_rep"]: s async for s in col.find({})}
+    assert stencils["10 11"]["open_jobs"][0]["cursor"] == [0, 0]
+    assert stencils["10 11"]["page_exp"] is not None
+    assert stencils["2 10 10"]["head"] == [0, 0, 0]
+    assert stencils["2 10 10"]["open_jobs"] == []
+
+
+async def test_startup_task_recovers_concurrently(
+    get_test_cfg,
+    setup_job_queue,
+    valid_rational_col,
+    empty_montesinos_stencil_col,
+    monkeypatch,
+):
+    monkeypatch.setitem(
+        cfg.cfg_dict["tangle-classes"]["montesinos"], "build-concurrency", 2
+    )
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    for str_rep, stencil_array in [("11 10", [11, 10]), ("10 11", [10, 11])]:
+        await col.insert_one(
+            {
+                "stencil_array": stencil_array,
+                "str_rep": str_rep,
+                "crossing_num": 21,
+                "head": [1, 1],
+                "state": 1,
+                "page_exp": 8,
+                "open_jobs": [
+                    {"job_id": f"{str_rep} {i}", "cursor": [i, 0]} for i in range(2)
+                ],
+            }
+        )
+    in_flight = []
+    peak = []
+    build = mj._build_job
+
+    async def tracking_build_job(*args, **kwargs):
+        in_flight.append(None)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return await build(*args, **kwargs)
+
+    monkeypatch.setattr(mj, "_build_job", tracking_build_job)
+    await startup_task()
+    assert max(peak) == 2
+    for str_rep in ["11 10", "10 11"]:
+        for i in range(2):
+            assert await jq.is_enqueued(f"{str_rep} {i}")
+
+
 ################################################################################
 ################################################################################
 # Test cases for the MontesinosJob.store function
@@ -231,3 +537,438 @@ async def test_mj_store_task_positive(
         assert m["_id"] in results_tangs
 
     ...
+
+
+################################################################################
+################################################################################
+# Test cases for the MontesinosJob.store_many function
+################################################################################
+################################################################################
+
+
+async def test_mj_store_many_positive(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    empty_montesinos_stencil_col,
+    empty_montesinos_col,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_one(
+        {
+            "stencil_array": [2, 2],
+            "str_rep": "2 2",
+            "crossing_num": 4,
+            "head": [2, 2],
+            "state": 2,
+            "open_jobs": [
+                {"job_id": "job 0", "cursor": [0, 0]},
+                {"job_id": "job 1", "cursor": [1, 0]},
+                {"job_id": "job 2", "cursor": [2, 0]},
+            ],
+        }
+    )
+    jobs = []
+    for i in range(2):
+        job = MontesinosJob(
+            cur_state=JobStateEnum.complete,
+            timestamp=datetime.now(timezone.utc),
+            crossing_num=4,
+            job_id=f"job {i}",
+            rat_lists=[],
+        )
+        job.stencil = "2 2"
+        job.update_results(
+            MontesinosJobResults(job_id=job.job_id, mont_list=[f"t{i}", "shared"])
+        )
+        jobs.append(job)
+
+    assert await MontesinosJob.store_many(jobs) == [True, True]
+
+    stencil = await col.find_one({"str_rep": "2 2"})
+    assert [j["job_id"] for j in stencil["open_jobs"]] == ["job 2"]
+    assert stencil["state"] == 2
+
+    tangles = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["col_name"]]
+    stored = [m["_id"] async for m in tangles.find({})]
+    assert sorted(stored) == ["shared", "t0", "t1"]
+
+    job = MontesinosJob(
+        cur_state=JobStateEnum.complete,
+        timestamp=datetime.now(timezone.utc),
+        crossing_num=4,
+        job_id="job 2",
+        rat_lists=[],
+    )
+    job.update_results(MontesinosJobResults(job_id="job 2", mont_list=["t2"]))
+    assert await MontesinosJob.store_many([job]) == [True]
+    stencil = await col.find_one({"str_rep": "2 2"})
+    assert stencil["open_jobs"] == []
+    assert stencil["state"] == 3
+
+
+async def test_mj_store_many_touches_only_held_stencils(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    empty_montesinos_stencil_col,
+    empty_montesinos_col,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_many(
+        [
+            {
+                "stencil_array": array,
+                "str_rep": " ".join(map(str, array)),
+                "crossing_num": sum(array),
+                "head": array,
+                "state": 2,
+                "open_jobs": jobs,
+            }
+            for array, jobs in [
+                ([2, 2], [{"job_id": "job 0", "cursor": [0, 0]}]),
+                ([3, 3], []),
+            ]
+        ]
+    )
+    job = MontesinosJob(
+        cur_state=JobStateEnum.complete,
+        timestamp=datetime.now(timezone.utc),
+        crossing_num=4,
+        job_id="job 0",
+        rat_lists=[],
+    )
+    job.update_results(MontesinosJobResults(job_id="job 0", mont_list=["t0"]))
+    assert await MontesinosJob.store_many([job]) == [True]
+    stencils = {s["str_rep"]: s async for s in col.find({})}
+    assert stencils["2 2"]["state"] == 3
+    # A stencil that held none of the jobs is left for its own completions.
+    assert stencils["3 3"]["state"] == 2
+
+
+async def test_mj_store_parallel_completions(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    empty_montesinos_stencil_col,
+    empty_montesinos_col,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_one(
+        {
+            "stencil_array": [2, 2],
+            "str_rep": "2 2",
+            "crossing_num": 4,
+            "head": [2, 2],
+            "state": 2,
+            "open_jobs": [{"job_id": f"job {i}", "cursor": [i, 0]} for i in range(4)],
+        }
+    )
+    jobs = []
+    for i in range(4):
+        job = MontesinosJob(
+            cur_state=JobStateEnum.complete,
+            timestamp=datetime.now(timezone.utc),
+            crossing_num=4,
+            job_id=f"job {i}",
+            rat_lists=[],
+        )
+        job.update_results(MontesinosJobResults(job_id=job.job_id, mont_list=[f"t{i}"]))
+        jobs.append(job)
+
+    assert await asyncio.gather(*[job.store() for job in jobs]) == [True] * 4
+    stencil = await col.find_one({"str_rep": "2 2"})
+    assert stencil["open_jobs"] == []
+    assert stencil["state"] == 3
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (RuntimeError("write failed"), [False, False]),
+        (
+            BulkWriteError(
+                {
+                    "writeErrors": [{"index": 0, "code": 1, "errmsg": "failed"}],
+                    "nInserted": 0,
+                    "nUpserted": 1,
+                }
+            ),
+            [False, True],
+        ),
+    ],
+)
+async def test_mj_store_many_write_failure(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    empty_montesinos_stencil_col,
+    empty_montesinos_col,
+    monkeypatch,
+    error,
+    expected,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_one(
+        {
+            "stencil_array": [2, 2],
+            "str_rep": "2 2",
+            "crossing_num": 4,
+            "head": [2, 2],
+            "state": 2,
+            "open_jobs": [{"job_id": f"job {i}", "cursor": [i, 0]} for i in range(2)],
+        }
+    )
+    jobs = []
+    for i in range(2):
+        job = MontesinosJob(
+            cur_state=JobStateEnum.complete,
+            timestamp=datetime.now(timezone.utc),
+            crossing_num=4,
+            job_id=f"job {i}",
+            rat_lists=[],
+        )
+        job.update_results(MontesinosJobResults(job_id=job.job_id, mont_list=[f"t{i}"]))
+        jobs.append(job)
+
+    class FailingCollection:
+        async def bulk_write(self, requests, **kwargs):
+            raise error
+
+    monkeypatch.setattr(mj.orm, "get_montesinos_collection", FailingCollection)
+    assert await MontesinosJob.store_many(jobs) == expected
+    # Only the stored jobs leave their stencil, the others are retried.
+    stencil = await col.find_one({"str_rep": "2 2"})
+    assert [j["job_id"] for j in stencil["open_jobs"]] == [
+        job.job_id for job, ok in zip(jobs, expected) if not ok
+    ]
+
+
+################################################################################
+################################################################################
+# Test cases for the task_fill_job_queue function
+################################################################################
+################################################################################
+
+
+async def _wait_for_new_count(count: int, timeout: float = 10) -> dict:
+    # The producer builds jobs concurrently, poll until it settles.
+    for i in range(int(timeout / 0.1)):
+        stats = await jq.get_job_statistics(MontesinosJob)
+        if stats["new"] == count:
+            break
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(0.1)
+    return await jq.get_job_statistics(MontesinosJob)
+
+
+async def test_task_fill_job_queue_positive(
+    get_test_cfg,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+):
+    low = cfg.cfg_dict["job-queue"]["min-new-count"]
+    task = asyncio.create_task(task_fill_job_queue())
+    try:
+        stats = await _wait_for_new_count(2 * low)
+        assert stats["new"] == 2 * low
+
+        # Leasing below the low watermark wakes the producer, which builds the
+        # last job the stencils hold.
+        await jq.get_next_jobs(MontesinosJob, User(username="client"), low + 1)
+        stats = await _wait_for_new_count(2)
+        assert stats["pending"] == low + 1
+        assert stats["new"] == 2
+    finally:
+        task.cancel()
+
+
+async def test_get_jobs_coalesces_concurrent_calls(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col_all_new,
+    monkeypatch,
+):
+    refills = []
+    build = mj._get_jobs
+
+    async def counting_get_jobs(count):
+        refills.append(count)
+        # mongomock never suspends, yield as a real database round trip would.
+        await asyncio.sleep(0)
+        return await build(count)
+
+    monkeypatch.setattr(mj, "_get_jobs", counting_get_jobs)
+    await asyncio.gather(*[get_jobs(1) for i in range(3)])
+    assert refills == [1]
+    stats = await jq.get_job_statistics(MontesinosJob)
+    assert stats["new"] == 1
+
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    cursors = []
+    async for s in col.find({}):
+        cursors.extend((s["str_rep"], str(j["cursor"])) for j in s["open_jobs"])
+    assert len(cursors) == len(set(cursors)) == 1
+
+
+async def test_get_jobs_does_not_overfill(monkeypatch):
+    refills = []
+
+    async def stub_get_jobs(count):
+        refills.append(count)
+        await asyncio.sleep(0.01)
+        return count
+
+    monkeypatch.setattr(mj, "_get_jobs", stub_get_jobs)
+    await asyncio.gather(*[get_jobs(100) for i in range(50)])
+    assert refills == [100]
+
+
+async def test_get_jobs_follow_up_pass(monkeypatch):
+    refills = []
+    finished = []
+    released = []
+
+    async def stub_get_jobs(count):
+        refills.append(count)
+        await asyncio.sleep(0.01)
+        finished.append(count)
+        return count
+
+    async def joiner():
+        await asyncio.sleep(0)
+        await get_jobs(3)
+        released.append(list(finished))
+
+    monkeypatch.setattr(mj, "_get_jobs", stub_get_jobs)
+    await asyncio.gather(get_jobs(1), joiner())
+    # The follow-up pass only builds what the first pass left of the joined demand,
+    # and the joiner is released when the pass it joined finishes.
+    assert refills == [1, 2]
+    assert released == [[1]]
+
+
+################################################################################
+################################################################################
+# Test cases for the rational page cache
+################################################################################
+################################################################################
+
+
+def test_page_cache_evicts_least_recently_used():
+    page = mj.RationalPage(["[1 0]", "[2 0]"])
+    cache = mj.PageCache(2 * mj.PageCache._page_bytes(page))
+    cache.put((2, 0, 8), page)
+    cache.put((3, 0, 8), mj.RationalPage(page))
+    assert cache.get((2, 0, 8)) is page
+    cache.put((4, 0, 8), page)
+    assert cache.get((3, 0, 8)) is None
+    assert cache.get((2, 0, 8)) is page
+    stats = cache.statistics()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["pages"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
+
+
+def test_page_cache_interns_held_pages():
+    cache = mj.PageCache(0)
+    page = cache.put((2, 0, 8), ["[1 0]", "[2 0]"])
+    assert cache.statistics()["pages"] == 0
+    assert cache.get((2, 0, 8)) is page
+    del page
+    assert cache.get((2, 0, 8)) is None
+
+
+async def test_get_jobs_reuses_cached_pages(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    valid_montesinos_stencil_col,
+    monkeypatch,
+):
+    reads = []
+    get_page = mj.page_index.get_page
+
+    async def counting_get_page(*args):
+        reads.append(args)
+        return await get_page(*args)
+
+    monkeypatch.setattr(mj.page_index, "get_page", counting_get_page)
+    await get_jobs(5)
+    pages = sum(
+        len(jq._job_queue[i].rat_lists)
+        for i in jq._job_queue
+        if isinstance(jq._job_queue[i], MontesinosJob)
+    )
+    assert len(reads) == len(set(reads))
+    assert len(reads) < pages
+
+
+################################################################################
+################################################################################
+# Test cases for the adaptive page exponent
+################################################################################
+################################################################################
+
+
+async def test_choose_page_exp_from_job_times(get_test_cfg, monkeypatch):
+    monkeypatch.setattr(mj, "_job_rates", dict())
+    mont_cfg = cfg.cfg_dict["tangle-classes"]["montesinos"]
+    assert mj._choose_page_exp([10, 10]) == mont_cfg["page-exp"]
+
+    monkeypatch.setitem(mont_cfg, "target-job-seconds", 64)
+    assert mj._choose_page_exp([10, 10]) == mont_cfg["page-exp"]
+
+    job = MontesinosJob(
+        timestamp=datetime.now(timezone.utc) - timedelta(seconds=15.9),
+        crossing_num=20,
+        job_id="timed",
+        rat_lists=[["a"] * 4, ["b"] * 4],
+    )
+    job.update_results(MontesinosJobResults(job_id="timed", mont_list=[]))
+    assert mj._job_rates[20] == pytest.approx(1, rel=0.1)
+    assert mj._choose_page_exp([10, 10]) == 3
+    assert mj._choose_page_exp([7, 7, 7]) == 2
+    assert mj._choose_page_exp([2, 3]) == mont_cfg["page-exp"]
+
+
+async def test_get_jobs_records_stencil_page_exp(
+    get_test_cfg,
+    setup_database,
+    setup_job_queue,
+    valid_rational_col,
+    empty_montesinos_stencil_col,
+    monkeypatch,
+):
+    monkeypatch.setattr(mj, "_choose_page_exp", lambda stencil_array: 2)
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_one(
+        {
+            "stencil_array": [10, 11],
+            "str_rep": "10 11",
+            "crossing_num": 21,
+            "head": [0, 0],
+            "state": 0,
+            "open_jobs": [],
+        }
+    )
+    await get_jobs(2)
+    stencil = await col.find_one({"str_rep": "10 11"})
+    assert stencil["page_exp"] == 2
+    assert stencil["head"] == [2, 0]
+    built = {
+        i: jq._job_queue[i].rat_lists
+        for i in jq._job_queue
+        if isinstance(jq._job_queue[i], MontesinosJob)
+    }
+    assert all(len(rat_page) == 4 for lists in built.values() for rat_page in lists)
+
+    jq._job_queue = jq.JobQueue()
+    await startup_task()
+    for job_id, rat_lists in built.items():
+        assert jq._job_queue[job_id].rat_lists == rat_lists
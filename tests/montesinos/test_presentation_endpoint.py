@@ -1,4 +1,5 @@
 import pytest
+import io
 import json
 from datetime import datetime, timezone
 from pathlib import Path
@@ -6,6 +7,8 @@ from httpx import AsyncClient, ASGITransport
 from fastapi import FastAPI
 
 from tanglenomicon_data_api.internal import security
+from tanglenomicon_data_api.internal import cursor as keyset
+from tanglenomicon_data_api.internal import rank_index
 from tanglenomicon_data_api.montesinos import presentation_endpoint
 from tanglenomicon_data_api.montesinos.job import MontesinosJob
 
@@ -52,6 +55,76 @@ async def test_retrieve_montesinos_tangles_positive(
         assert len(data) == 100
 
 
+@pytest.mark.anyio
+async def test_retrieve_montesinos_tangles_cursor(
+    get_test_cfg,
+    valid_montesinos_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        params = {"page_idx": 0, "page_size": 40}
+        for page_idx in range(3):
+            by_idx = await ac.get(
+                "/montesinos/tangles", params={"page_idx": page_idx, "page_size": 40}
+            )
+            by_cursor = await ac.get("/montesinos/tangles", params=params)
+            assert by_cursor.status_code == 200
+            assert by_cursor.json() == by_idx.json()
+            params = {
+                "cursor": by_cursor.headers["X-Next-Cursor"],
+                "page_size": 40,
+            }
+
+
+@pytest.mark.anyio
+async def test_retrieve_montesinos_tangles_invalid_cursor(
+    get_test_cfg,
+    valid_montesinos_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/montesinos/tangles", params={"cursor": "not a cursor", "page_size": 10}
+        )
+        assert response.status_code == 404
+        foreign = keyset.encode_cursor("rational", 0, "")
+        response = await ac.get(
+            "/montesinos/tangles", params={"cursor": foreign, "page_size": 10}
+        )
+        assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_retrieve_montesinos_tangles_ranked(
+    get_test_cfg,
+    valid_montesinos_col,
+    monkeypatch,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        walked = []
+        for page_idx in range(4):
+            response = await ac.get(
+                "/montesinos/tangles",
+                params={"crossing_num_min": 5, "page_idx": page_idx, "page_size": 30},
+            )
+            walked.append(response.json())
+        response = await ac.get("/montesinos/tangle_counts")
+        assert response.status_code == 404
+        monkeypatch.setitem(cfg.cfg_dict["tangle-classes"]["montesinos"], "rank", True)
+        await rank_index.ensure_ranked("montesinos")
+        for page_idx in range(4):
+            response = await ac.get(
+                "/montesinos/tangles",
+                params={"crossing_num_min": 5, "page_idx": page_idx, "page_size": 30},
+            )
+            assert response.status_code == 200
+            assert response.json() == walked[page_idx]
+        response = await ac.get("/montesinos/tangle_counts")
+        assert response.status_code == 200
+        assert sum(response.json().values()) == 161
+
+
 @pytest.mark.anyio
 async def test_retrieve_montesinos_tangles_empty_col(
     get_test_cfg,
@@ -141,3 +214,141 @@ async def test_retrieve_montesinos_job_queue_stats_positive(
             "pending": 5,
             "complete": 6,
         }
+
+
+################################################################################
+################################################################################
+# Test cases for the retrieve_page_cache_stats endpoint
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_retrieve_page_cache_stats_positive(get_test_cfg):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/montesinos/page_cache/stats")
+        assert response.status_code == 200
+        assert set(response.json()) == {
+            "hits",
+            "misses",
+            "pages",
+            "interned",
+            "bytes",
+            "max_bytes",
+        }
+
+
+################################################################################
+################################################################################
+# Test cases for the export_montesinos_tangles endpoint
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_export_montesinos_tangles_positive(
+    get_test_cfg,
+    valid_montesinos_col,
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["col_name"]]
+    expected = (
+        await col.find({"crossing_num": {"$gte": 5, "$lte": 6}})
+        .sort([("crossing_num", 1), ("_id", 1)])
+        .to_list(None)
+    )
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/montesinos/export", params={"crossing_num_min": 5, "crossing_num_max": 6}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [
+            {f: tang[f] for f in ["_id", "crossing_num", "parent_stencil"]}
+            for tang in expected
+        ]
+
+
+@pytest.mark.anyio
+async def test_export_montesinos_tangles_resume(
+    get_test_cfg,
+    valid_montesinos_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/montesinos/export")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 161
+        response = await ac.get(
+            "/montesinos/export", params={"start_id": rows[99]["_id"]}
+        )
+        assert response.status_code == 200
+        resumed = [json.loads(line) for line in response.text.splitlines()]
+        assert resumed == rows[100:]
+
+
+@pytest.mark.anyio
+async def test_export_montesinos_tangles_csv(
+    get_test_cfg,
+    valid_montesinos_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        ndjson = await ac.get("/montesinos/export")
+        response = await ac.get("/montesinos/export", params={"format": "csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.splitlines()
+        assert lines[0] == "_id,crossing_num,parent_stencil"
+        first = json.loads(ndjson.text.splitlines()[0])
+        assert (
+            lines[1]
+            == f"{first['_id']},{first['crossing_num']},{first['parent_stencil']}"
+        )
+        assert len(lines) == 162
+
+
+@pytest.mark.anyio
+async def test_export_montesinos_tangles_parquet(
+    get_test_cfg,
+    valid_montesinos_col,
+):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        ndjson = await ac.get("/montesinos/export")
+        response = await ac.get("/montesinos/export", params={"format": "parquet"})
+        assert response.status_code == 200
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.to_pylist() == [
+            json.loads(line) for line in ndjson.text.splitlines()
+        ]
+
+
+@pytest.mark.anyio
+async def test_export_montesinos_tangles_invalid(
+    get_test_cfg,
+    valid_montesinos_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/montesinos/export", params={"start_id": "missing"})
+        assert response.status_code == 404
+        response = await ac.get("/montesinos/export", params={"format": "xml"})
+        assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_export_montesinos_tangles_empty_col(
+    get_test_cfg,
+    empty_montesinos_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/montesinos/export")
+        assert response.status_code == 200
+        assert response.text == ""
@@ -0,0 +1,184 @@
+"""Unit tests for the montesinos stencil generator."""
+
+import pytest
+import asyncio
+import time
+from tanglenomicon_data_api.montesinos import stencils as ms
+from tanglenomicon_data_api.montesinos import orm
+from tanglenomicon_data_api.internal import config_store as cfg
+from tanglenomicon_data_api.internal import db_connector as dbc
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+################################################################################
+################################################################################
+# Test cases for the stencil_arrays function
+################################################################################
+################################################################################
+
+
+def test_stencil_arrays_positive():
+    assert sorted(ms.stencil_arrays(6)) == [[2, 2, 2], [2, 4], [3, 3]]
+    assert sorted(ms.stencil_arrays(8)) == [
+        [2, 2, 2, 2],
+        [2, 2, 4],
+        [2, 3, 3],
+        [2, 6],
+        [3, 5],
+        [4, 4],
+    ]
+    assert all(sum(s) == 11 for s in ms.stencil_arrays(11))
+    assert list(ms.stencil_arrays(3)) == []
+
+
+################################################################################
+################################################################################
+# Test cases for the generate_stencils function
+################################################################################
+################################################################################
+
+
+async def test_generate_stencils_positive(
+    get_test_cfg, setup_database, empty_montesinos_stencil_col
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_one(
+        {
+            "stencil_array": [3, 3],
+            "str_rep": "3 3",
+            "crossing_num": 6,
+            "head": [1, 0],
+            "state": 1,
+            "open_jobs": [],
+        }
+    )
+    assert await ms.generate_stencils(4, 6) == 4
+    stencils = {s["str_rep"]: s async for s in col.find({})}
+    assert sorted(stencils) == ["2 2", "2 2 2", "2 3", "2 4", "3 3"]
+    assert stencils["3 3"]["head"] == [1, 0]
+    assert stencils["2 2 2"]["head"] == [0, 0, 0]
+    assert stencils["2 2 2"]["state"] == orm.StencilStateEnum.new
+    assert stencils["2 2 2"]["crossing_num"] == 6
+
+    assert await ms.generate_stencils(4, 6) == 0
+
+
+async def test_generate_stencils_skips_equivalent(
+    get_test_cfg, setup_database, empty_montesinos_stencil_col
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    await col.insert_one(
+        {
+            "stencil_array": [3, 2],
+            "str_rep": "3 2",
+            "crossing_num": 5,
+            "head": [1, 0],
+            "state": 1,
+            "open_jobs": [],
+        }
+    )
+    # The stored "3 2" is equivalent to the canonical "2 3".
+    assert await ms.generate_stencils(5, 5) == 0
+    assert [s["str_rep"] async for s in col.find({})] == ["3 2"]
+
+
+async def test_generate_stencils_yields_to_loop(
+    get_test_cfg, setup_database, empty_montesinos_stencil_col, monkeypatch
+):
+    def slow_arrays(crossing_num):
+        for stencil_array in [[2, 4], [3, 3], [2, 2, 2]]:
+            time.sleep(0.05)
+            yield stencil_array
+
+    monkeypatch.setattr(ms, "stencil_arrays", slow_arrays)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        assert await ms.generate_stencils(6, 6) == 3
+    finally:
+        task.cancel()
+    # The loop kept running while the arrays were enumerated.
+    assert ticks >= 5
+
+
+################################################################################
+################################################################################
+# Test cases for the reset_started_stencils function
+################################################################################
+################################################################################
+
+
+async def test_reset_started_stencils_positive(
+    get_test_cfg, setup_database, empty_montesinos_stencil_col
+):
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    open_job = {"job_id": "a", "cursor": [1, 0]}
+    await col.insert_many(
+        [
+            {
+                "stencil_array": array,
+                "str_rep": " ".join(map(str, array)),
+                "crossing_num": sum(array),
+                "head": head,
+                "state": state,
+                "open_jobs": jobs,
+                "page_exp": 3,
+            }
+            for array, head, state, jobs in [
+                ([2, 2], [0, 0], orm.StencilStateEnum.new, []),
+                ([2, 3], [2, 1], orm.StencilStateEnum.started, [open_job]),
+                ([3, 3], [0, 4], orm.StencilStateEnum.no_headroom, [open_job]),
+                ([2, 2, 2], [0, 0, 0], orm.StencilStateEnum.complete, []),
+            ]
+        ]
+    )
+    assert await ms.reset_started_stencils() == 2
+    stencils = {s["str_rep"]: s async for s in col.find({})}
+    for str_rep in ["2 3", "3 3"]:
+        assert stencils[str_rep]["head"] == [0, 0]
+        assert stencils[str_rep]["state"] == orm.StencilStateEnum.new
+        assert stencils[str_rep]["open_jobs"] == []
+        assert "page_exp" not in stencils[str_rep]
+    assert stencils["2 2"]["page_exp"] == 3
+    assert stencils["2 2 2"]["state"] == orm.StencilStateEnum.complete
+    assert await ms.reset_started_stencils() == 0
+
+
+################################################################################
+################################################################################
+# Test cases for the task_generate_stencils function
+################################################################################
+################################################################################
+
+
+async def test_task_generate_stencils_positive(
+    get_test_cfg, setup_database, empty_montesinos_stencil_col, monkeypatch
+):
+    monkeypatch.setitem(
+        cfg.cfg_dict["tangle-classes"]["montesinos"], "max-crossing-num", 5
+    )
+    monkeypatch.setitem(cfg.cfg_dict["job-queue"]["clocks"], "stencil", 0.05)
+    col = dbc.db[cfg.cfg_dict["tangle-classes"]["montesinos"]["stencil_col_name"]]
+    task = asyncio.create_task(ms.task_generate_stencils())
+    try:
+        await asyncio.sleep(0.2)
+        # The stencils of the next crossing number wait until none is open.
+        assert [s["str_rep"] async for s in col.find({})] == ["2 2"]
+        await col.update_many({}, {"$set": {"state": orm.StencilStateEnum.complete}})
+        await asyncio.sleep(0.2)
+    finally:
+        task.cancel()
+    assert sorted([s["str_rep"] async for s in col.find({})]) == ["2 2", "2 3"]
@@ -0,0 +1,39 @@
+"""Unit tests for the montesinos stencil symmetries."""
+
+from tanglenomicon_data_api.montesinos import symmetry
+
+
+################################################################################
+################################################################################
+# Test cases for the canonical_array function
+################################################################################
+################################################################################
+
+
+def test_canonical_array_positive():
+    assert symmetry.canonical_array([4, 5, 3]) == [3, 4, 5]
+    assert symmetry.canonical_array([5, 4, 3]) == [3, 4, 5]
+    assert symmetry.canonical_array([3, 5, 4]) == [3, 4, 5]
+    assert symmetry.canonical_array([11, 10]) == [10, 11]
+    assert symmetry.is_canonical_array([2, 10, 10])
+    assert not symmetry.is_canonical_array([10, 2, 10])
+
+
+################################################################################
+################################################################################
+# Test cases for the stabilizer and is_canonical_head functions
+################################################################################
+################################################################################
+
+
+def test_stabilizer_positive():
+    assert symmetry.stabilizer([3, 4, 5]) == [(0, 1, 2)]
+    assert len(symmetry.stabilizer([2, 2, 2])) == 6
+    assert len(symmetry.stabilizer([2, 10, 10])) == 2
+
+
+def test_is_canonical_head_positive():
+    symmetries = symmetry.stabilizer([10, 10])
+    assert symmetry.is_canonical_head([0, 1], symmetries)
+    assert not symmetry.is_canonical_head([1, 0], symmetries)
+    assert symmetry.is_canonical_head([1, 0], symmetry.stabilizer([11, 10]))
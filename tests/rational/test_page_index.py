@@ -0,0 +1,137 @@
+import pytest
+
+from tanglenomicon_data_api.rational import page_index
+from tanglenomicon_data_api.rational import orm as rat_orm
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+################################################################################
+################################################################################
+# Test cases for the ensure_ranked function
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_ensure_ranked_positive(get_test_cfg, valid_rational_col):
+    assert await page_index.ensure_ranked(2) == 1
+    assert await page_index.ensure_ranked(3) == 2
+    assert await page_index.ensure_ranked(10) == 256
+    assert await page_index.ensure_ranked(11) == 512
+    col = rat_orm.get_rational_collection()
+    ranks = [
+        doc[page_index.RANK_FIELD]
+        async for doc in col.find({"crossing_num": 11} | page_index.UNIT_FILTER).sort(
+            "_id", 1
+        )
+    ]
+    assert ranks == list(range(512))
+
+
+@pytest.mark.anyio
+async def test_ensure_ranked_invalidate(get_test_cfg, valid_rational_col):
+    assert await page_index.ensure_ranked(3) == 2
+    col = rat_orm.get_rational_collection()
+    await col.insert_one(
+        {
+            "_id": "[0 0]",
+            "crossing_num": 3,
+            "in_unit_interval": True,
+            "isRational": True,
+        }
+    )
+    assert await page_index.ensure_ranked(3) == 2
+    page_index.invalidate(3)
+    assert await page_index.ensure_ranked(3) == 3
+    assert await page_index.get_page(3, 0, 8) == [
+        doc["_id"]
+        async for doc in col.find({"crossing_num": 3} | page_index.UNIT_FILTER).sort(
+            "_id", 1
+        )
+    ]
+
+
+@pytest.mark.anyio
+async def test_ensure_ranked_writes_changed_ranks(
+    get_test_cfg, valid_rational_col, monkeypatch
+):
+    col = rat_orm.get_rational_collection()
+    writes = []
+
+    class RecordingCollection:
+        def __getattr__(self, name):
+            return getattr(col, name)
+
+        async def bulk_write(self, requests, **kwargs):
+            writes.append(len(requests))
+            return await col.bulk_write(requests, **kwargs)
+
+    monkeypatch.setattr(page_index.orm, "get_rational_collection", RecordingCollection)
+    monkeypatch.setattr(page_index, "_BULK_SIZE", 100)
+    assert await page_index.ensure_ranked(11) == 512
+    assert writes == [100] * 5 + [12]
+    # Only the unranked tangle is written when ranking again.
+    writes.clear()
+    last = await col.find_one(
+        {"crossing_num": 11} | page_index.UNIT_FILTER, sort=[("_id", -1)]
+    )
+    await col.update_one({"_id": last["_id"]}, {"$unset": {page_index.RANK_FIELD: ""}})
+    page_index.invalidate(11)
+    assert await page_index.ensure_ranked(11) == 512
+    assert writes == [1]
+    assert (await col.find_one({"_id": last["_id"]}))[page_index.RANK_FIELD] == 511
+
+
+################################################################################
+################################################################################
+# Test cases for the get_page function
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_get_page_positive(get_test_cfg, valid_rational_col):
+    col = rat_orm.get_rational_collection()
+    expected = [
+        doc["_id"]
+        async for doc in col.find({"crossing_num": 11} | page_index.UNIT_FILTER).sort(
+            "_id", 1
+        )
+    ]
+    assert await page_index.get_page(11, 0, 8) == expected[:256]
+    assert await page_index.get_page(11, 1, 8) == expected[256:]
+    assert await page_index.get_page(11, 2, 8) == []
+
+
+@pytest.mark.anyio
+async def test_get_page_empty_col(get_test_cfg, empty_rational_col):
+    with pytest.raises(page_index.EmptyRationalError):
+        await page_index.get_page(11, 0, 8)
+
+
+################################################################################
+################################################################################
+# Test cases for the page_count and startup_task functions
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_page_count_positive(get_test_cfg, valid_rational_col):
+    assert await page_index.page_count(2, 8) == 1
+    assert await page_index.page_count(10, 8) == 1
+    assert await page_index.page_count(11, 8) == 2
+    assert await page_index.page_count(11, 6) == 8
+    assert await page_index.page_count(11, 5) == 16
+
+
+@pytest.mark.anyio
+async def test_startup_task_positive(get_test_cfg, valid_rational_col):
+    await page_index.startup_task()
+    assert {2: 1, 3: 2, 10: 256, 11: 512}.items() <= page_index._ranked.items()
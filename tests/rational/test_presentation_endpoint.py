@@ -1,4 +1,6 @@
 import pytest
+import csv
+import io
 import json
 from datetime import datetime, timezone
 from pathlib import Path
@@ -7,6 +9,7 @@ from fastapi import FastAPI
 
 from tanglenomicon_data_api.rational import presentation_endpoint
 from tanglenomicon_data_api.internal import config_store as cfg
+from tanglenomicon_data_api.internal import cursor as keyset
 
 api: FastAPI = FastAPI()
 routers = [presentation_endpoint]
@@ -46,6 +49,67 @@ async def test_retrieve_rational_tangles_positive(
         assert len(data) == 100
 
 
+@pytest.mark.anyio
+async def test_retrieve_rational_tangles_fields(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/rational/tangles", params={"page_size": 10})
+        assert response.status_code == 200
+        for tang in response.json():
+            assert list(tang) == [
+                "_id",
+                "twist_vector",
+                "crossing_num",
+                "tv_array",
+                "in_unit_interval",
+            ]
+        schema = api.openapi()["paths"]["/rational/tangles"]["get"]["responses"]
+        items = schema["200"]["content"]["application/json"]["schema"]["items"]
+        assert items["$ref"].endswith("/RationalTangDB")
+
+
+@pytest.mark.anyio
+async def test_retrieve_rational_tangles_cursor(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        params = {"page_idx": 0, "page_size": 40}
+        for page_idx in range(3):
+            by_idx = await ac.get(
+                "/rational/tangles", params={"page_idx": page_idx, "page_size": 40}
+            )
+            by_cursor = await ac.get("/rational/tangles", params=params)
+            assert by_cursor.status_code == 200
+            assert by_cursor.json() == by_idx.json()
+            params = {
+                "cursor": by_cursor.headers["X-Next-Cursor"],
+                "page_size": 40,
+            }
+
+
+@pytest.mark.anyio
+async def test_retrieve_rational_tangles_invalid_cursor(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/rational/tangles", params={"cursor": "not a cursor", "page_size": 10}
+        )
+        assert response.status_code == 404
+        foreign = keyset.encode_cursor("generic", 0, "")
+        response = await ac.get(
+            "/rational/tangles", params={"cursor": foreign, "page_size": 10}
+        )
+        assert response.status_code == 404
+
+
 @pytest.mark.anyio
 async def test_retrieve_rational_tangles_empty_col(
     get_test_cfg,
@@ -72,3 +136,112 @@ async def test_retrieve_rational_tangles_empty_list(
             "/rational/tangles", params={"page_idx": 0, "page_size": 0}
         )
         assert response.status_code == 404
+
+
+################################################################################
+################################################################################
+# Test cases for the retrieve_rational_page endpoint
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_retrieve_rational_page_positive(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/rational/pages/11/1", params={"page_exp": 8})
+        assert response.status_code == 200
+        assert len(response.json()) == 256
+        etag = response.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+
+        response = await ac.get(
+            "/rational/pages/11/1",
+            params={"page_exp": 8},
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+        response = await ac.get("/rational/pages/11/0", params={"page_exp": 8})
+        assert response.headers["etag"] != etag
+
+
+@pytest.mark.anyio
+async def test_retrieve_rational_page_out_of_range(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/rational/pages/11/2", params={"page_exp": 8})
+        assert response.status_code == 404
+        response = await ac.get("/rational/pages/11/-1", params={"page_exp": 8})
+        assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_retrieve_rational_page_empty_col(
+    get_test_cfg,
+    empty_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/rational/pages/11/0", params={"page_exp": 8})
+        assert response.status_code == 404
+
+
+################################################################################
+################################################################################
+# Test cases for the export_rational_tangles endpoint
+################################################################################
+################################################################################
+
+
+@pytest.mark.anyio
+async def test_export_rational_tangles_csv(
+    get_test_cfg,
+    valid_rational_col,
+):
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/rational/export",
+            params={"format": "csv", "crossing_num_min": 3, "crossing_num_max": 3},
+        )
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 4
+        for row in rows:
+            assert row["crossing_num"] == "3"
+            assert isinstance(json.loads(row["tv_array"]), list)
+        ndjson = await ac.get(
+            "/rational/export", params={"crossing_num_min": 3, "crossing_num_max": 3}
+        )
+        tangles = [json.loads(line) for line in ndjson.text.splitlines()]
+        assert [row["_id"] for row in rows] == [tang["_id"] for tang in tangles]
+        assert [json.loads(row["tv_array"]) for row in rows] == [
+            tang["tv_array"] for tang in tangles
+        ]
+
+
+@pytest.mark.anyio
+async def test_export_rational_tangles_arrow(
+    get_test_cfg,
+    valid_rational_col,
+):
+    pa = pytest.importorskip("pyarrow")
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        ndjson = await ac.get("/rational/export")
+        response = await ac.get("/rational/export", params={"format": "arrow"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.schema.field("tv_array").type == pa.list_(pa.int64())
+        assert table.to_pylist() == [
+            json.loads(line) for line in ndjson.text.splitlines()
+        ]